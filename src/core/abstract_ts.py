@@ -8,9 +8,11 @@ Define a estrutura geral que pode ser especializada para diferentes problemas.
 
 import random
 from abc import ABC, abstractmethod
-from collections import deque
+from collections import Counter, deque
 from typing import List, Any, Optional
 
+import numpy as np
+
 from core.solution import Solution
 from core.evaluator import Evaluator
 
@@ -131,6 +133,9 @@ class AbstractTabuSearch(ABC):
         Returns:
             Solution: Solução inicial construída
         """
+        # Lê a flag uma única vez, fora dos laços
+        verbose = self.VERBOSE
+        
         # Inicializa estruturas
         self.candidate_list = self.make_candidate_list()
         self.restricted_candidate_list = self.make_restricted_candidate_list()
@@ -139,6 +144,9 @@ class AbstractTabuSearch(ABC):
         # Avalia solução inicial (vazia)
         self.obj_function.evaluate(self.current_sol)
         
+        # Máscara de pertinência mantida incrementalmente durante a construção
+        in_solution = self._make_membership_mask()
+        
         max_iterations = len(self.candidate_list) * 2  # Limite de segurança
         iteration_count = 0
         
@@ -149,31 +157,24 @@ class AbstractTabuSearch(ABC):
             self.update_candidate_list()
             
             # Obtém candidatos disponíveis
-            available_candidates = self._get_available_candidates()
+            available_candidates = self._get_available_candidates(in_solution)
             
-            if not available_candidates:
-                if self.VERBOSE:
+            if available_candidates.size == 0:
+                if verbose:
                     print("Nenhum candidato disponível - finalizando construção")
                 break
             
-            # Encontra o range de custos dos candidatos
-            min_cost = float('inf')
-            
-            candidate_costs = {}
-            for candidate in available_candidates:
-                delta_cost = self.obj_function.evaluate_insertion_cost(candidate, self.current_sol)
-                candidate_costs[candidate] = delta_cost
-                if delta_cost < min_cost:
-                    min_cost = delta_cost
+            # Avalia o custo de inserção de todos os candidatos de uma só vez
+            all_costs = np.asarray(self.obj_function.evaluate_all_insertion_costs(self.current_sol))
+            delta_costs = all_costs[available_candidates]
+            min_cost = delta_costs.min()
             
             # Constrói RCL com candidatos de melhor performance (menor custo)
             self.restricted_candidate_list.clear()
-            for candidate, delta_cost in candidate_costs.items():
-                if delta_cost <= min_cost:  # Apenas os melhores
-                    self.restricted_candidate_list.append(candidate)
+            self.restricted_candidate_list.extend(available_candidates[delta_costs <= min_cost].tolist())
             
             if not self.restricted_candidate_list:
-                if self.VERBOSE:
+                if verbose:
                     print("RCL vazia - finalizando construção")
                 break
             
@@ -183,37 +184,57 @@ class AbstractTabuSearch(ABC):
             
             # Adiciona à solução e reavalia
             self.current_sol.add_element(selected_candidate)
+            in_solution[selected_candidate] = True
             self.obj_function.evaluate(self.current_sol)
             
             # Critério de parada: sem melhoria significativa
             if abs(self.current_sol.cost - previous_cost) < 1e-10:
-                if self.VERBOSE:
+                if verbose:
                     print(f"Sem melhoria significativa - finalizando construção na iteração {iteration_count}")
                 break
             
             # Para maximização (QBF inversa com valores negativos), 
             # se o custo está piorando muito, para
             if self.current_sol.cost > previous_cost + abs(previous_cost) * 0.1:
-                if self.VERBOSE:
+                if verbose:
                     print(f"Custo piorando muito - finalizando construção")
                 break
             
             iteration_count += 1
         
-        if self.VERBOSE:
+        if verbose:
             print(f"Heurística construtiva finalizada em {iteration_count} iterações")
             print(f"Solução inicial: {self.current_sol}")
         
         return self.current_sol
     
-    def _get_available_candidates(self) -> List[Any]:
+    def _make_membership_mask(self) -> np.ndarray:
+        """
+        Cria a máscara booleana de pertinência da solução atual.
+        
+        Returns:
+            np.ndarray: Máscara indexada pelo elemento (True se está na solução)
+        """
+        in_solution = np.zeros(self.obj_function.get_domain_size(), dtype=bool)
+        in_solution[np.fromiter(self.current_sol, dtype=np.intp, count=len(self.current_sol))] = True
+        return in_solution
+    
+    def _get_available_candidates(self, in_solution: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Retorna candidatos disponíveis (não estão na solução atual).
+        Usa uma máscara booleana de pertinência em vez de buscas lineares na solução.
+        
+        Args:
+            in_solution (Optional[np.ndarray]): Máscara de pertinência já atualizada
+                (se omitida, é construída a partir da solução atual)
         
         Returns:
-            List[Any]: Lista de candidatos disponíveis
+            np.ndarray: Vetor com os candidatos disponíveis
         """
-        return [c for c in self.candidate_list if not self.current_sol.contains_element(c)]
+        if in_solution is None:
+            in_solution = self._make_membership_mask()
+        candidates = np.asarray(self.candidate_list, dtype=np.intp)
+        return candidates[~in_solution[candidates]]
     
     def solve(self) -> Solution:
         """
@@ -222,6 +243,9 @@ class AbstractTabuSearch(ABC):
         Returns:
             Solution: Melhor solução encontrada
         """
+        # Lê a flag uma única vez, fora dos laços
+        verbose = self.VERBOSE
+        
         # Inicializa melhor solução
         self.best_sol = self.create_empty_solution()
         
@@ -234,7 +258,7 @@ class AbstractTabuSearch(ABC):
         # Define melhor solução como a inicial
         self.best_sol = self.current_sol.copy()
         
-        if self.VERBOSE:
+        if verbose:
             print(f"Solução inicial: {self.current_sol}")
         
         # Loop principal do Tabu Search
@@ -245,7 +269,7 @@ class AbstractTabuSearch(ABC):
             # Atualiza melhor solução se necessário
             if self.current_sol.cost < self.best_sol.cost:
                 self.best_sol = self.current_sol.copy()
-                if self.VERBOSE:
+                if verbose:
                     print(f"(Iter. {iteration}) Nova melhor solução: {self.best_sol}")
         
         return self.best_sol
@@ -268,6 +292,34 @@ class AbstractTabuSearch(ABC):
         """
         return self.current_sol
     
+    @property
+    def tabu_list(self) -> Optional[deque]:
+        """
+        Lista tabu atual.
+        
+        Returns:
+            Optional[deque]: Lista tabu ou None se não foi inicializada
+        """
+        return self._tabu_list
+    
+    @tabu_list.setter
+    def tabu_list(self, tabu_list: Optional[deque]):
+        """
+        Define a lista tabu e reconstrói o contador de ocorrências usado por is_tabu.
+        
+        Args:
+            tabu_list (Optional[deque]): Nova lista tabu
+        """
+        self._tabu_list = tabu_list
+        self._rebuild_tabu_index()
+    
+    def _rebuild_tabu_index(self):
+        """
+        Reconstrói as estruturas auxiliares de consulta da lista tabu
+        (o contador de ocorrências usado por is_tabu).
+        """
+        self._tabu_counts = Counter(self._tabu_list) if self._tabu_list is not None else Counter()
+    
     def get_tabu_list(self) -> Optional[deque]:
         """
         Retorna a lista tabu atual.
@@ -287,7 +339,7 @@ class AbstractTabuSearch(ABC):
         Returns:
             bool: True se o elemento é tabu
         """
-        return self.tabu_list is not None and element in self.tabu_list
+        return element in self._tabu_counts
     
     def aspiration_criteria(self, element: Any, delta_cost: float) -> bool:
         """
@@ -306,6 +358,33 @@ class AbstractTabuSearch(ABC):
         # Aceita se o movimento resulta em solução melhor que a melhor conhecida
         return self.current_sol.cost + delta_cost < self.best_sol.cost
     
+    def aspiration_mask(self, delta_costs: np.ndarray) -> np.ndarray:
+        """
+        Versão vetorizada do critério de aspiração para vários movimentos.
+        
+        Args:
+            delta_costs (np.ndarray): Variações de custo dos movimentos
+            
+        Returns:
+            np.ndarray: Máscara booleana dos movimentos aceitos pela aspiração
+        """
+        if self.current_sol is None or self.best_sol is None:
+            return np.zeros(np.shape(delta_costs), dtype=bool)
+        
+        return self.current_sol.cost + delta_costs < self.best_sol.cost
+    
+    def tabu_mask(self, elements: List[Any]) -> np.ndarray:
+        """
+        Retorna uma máscara booleana indicando quais elementos são tabu.
+        
+        Args:
+            elements: Elementos a serem verificados
+            
+        Returns:
+            np.ndarray: Máscara booleana (True se o elemento é tabu)
+        """
+        return np.fromiter((self.is_tabu(e) for e in elements), dtype=bool, count=len(elements))
+    
     def add_to_tabu_list(self, element: Any):
         """
         Adiciona um elemento à lista tabu.
@@ -314,8 +393,14 @@ class AbstractTabuSearch(ABC):
             element: Elemento a ser adicionado
         """
         if self.tabu_list is not None:
-            self.tabu_list.popleft()  # Remove o mais antigo
+            oldest = self.tabu_list.popleft()  # Remove o mais antigo
             self.tabu_list.append(element)  # Adiciona o novo
+            
+            # Mantém o contador de ocorrências sincronizado com a lista
+            self._tabu_counts[oldest] -= 1
+            if self._tabu_counts[oldest] <= 0:
+                del self._tabu_counts[oldest]
+            self._tabu_counts[element] += 1
     
     def set_verbose(self, verbose: bool):
         """
@@ -7,7 +7,7 @@ Define os métodos que todo avaliador deve implementar.
 """
 
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, List
 from core.solution import Solution
 
 
@@ -54,6 +54,19 @@ class Evaluator(ABC):
         """
         pass
     
+    def evaluate_all_insertion_costs(self, solution: Solution) -> List[float]:
+        """
+        Avalia o custo de inserir cada elemento do domínio na solução.
+        Implementações podem sobrescrever para calcular todos os custos de uma vez.
+        
+        Args:
+            solution (Solution): Solução atual
+            
+        Returns:
+            List[float]: Custo de inserção indexado pelo elemento
+        """
+        return [self.evaluate_insertion_cost(elem, solution) for elem in range(self.get_domain_size())]
+    
     @abstractmethod
     def evaluate_removal_cost(self, element: Any, solution: Solution) -> float:
         """
@@ -68,6 +81,19 @@ class Evaluator(ABC):
         """
         pass
     
+    def evaluate_all_removal_costs(self, solution: Solution) -> List[float]:
+        """
+        Avalia o custo de remover cada elemento do domínio da solução.
+        Implementações podem sobrescrever para calcular todos os custos de uma vez.
+        
+        Args:
+            solution (Solution): Solução atual
+            
+        Returns:
+            List[float]: Custo de remoção indexado pelo elemento
+        """
+        return [self.evaluate_removal_cost(elem, solution) for elem in range(self.get_domain_size())]
+    
     @abstractmethod
     def evaluate_exchange_cost(self, element_in: Any, element_out: Any, solution: Solution) -> float:
         """
@@ -82,3 +108,20 @@ class Evaluator(ABC):
             float: Variação do custo ao fazer a troca
         """
         pass
+    
+    def evaluate_all_exchange_costs(self, elements_in: List[Any], elements_out: List[Any],
+                                    solution: Solution) -> List[List[float]]:
+        """
+        Avalia o custo de todas as trocas entre elements_in e elements_out.
+        Implementações podem sobrescrever para calcular todos os custos de uma vez.
+        
+        Args:
+            elements_in: Elementos candidatos a entrar na solução
+            elements_out: Elementos candidatos a sair da solução
+            solution (Solution): Solução atual
+            
+        Returns:
+            List[List[float]]: Matriz de custos indexada por [entrada][saída]
+        """
+        return [[self.evaluate_exchange_cost(elem_in, elem_out, solution) for elem_out in elements_out]
+                for elem_in in elements_in]
@@ -5,7 +5,11 @@ qbf.py
 Implementação da função objetivo para o problema Quadratic Binary Function (QBF).
 """
 
+import copy
 from typing import List
+
+import numpy as np
+
 from core.evaluator import Evaluator
 from core.solution import Solution
 
@@ -16,16 +20,64 @@ class QBF(Evaluator):
     Implementa f(x) = x^T * A * x onde x é um vetor binário.
     """
     
-    def __init__(self, filename: str):
+    # Maior inteiro a partir do qual float32 deixa de representar todos os inteiros
+    FLOAT32_EXACT_LIMIT = 2 ** 24
+    
+    # Flag para controlar as mensagens de carregamento da instância
+    VERBOSE = True
+    
+    # Tamanho do buffer de leitura dos arquivos de instância (1 MiB)
+    READ_BUFFER_SIZE = 1 << 20
+    
+    # Sinal aplicado à função objetivo (QBFInverse usa -1)
+    SIGN = 1.0
+    
+    def __init__(self, filename: str, dtype=None):
         """
         Inicializa a QBF lendo dados de um arquivo.
         
         Args:
             filename (str): Nome do arquivo contendo a matriz A
+            dtype: Tipo numérico usado no armazenamento e nos cálculos (opcional).
+                   Por padrão usa float32 quando o resultado é exato, senão float64.
         """
         self.A = None
         self.size = self._read_input(filename)
-        self.variables = [1.0] * self.size
+        
+        # Garante matriz contígua mesmo se a subclasse leu listas aninhadas
+        A = np.asarray(self.A, dtype=np.float64)
+        if A.shape != (self.size, self.size):
+            raise ValueError(f"Matriz com dimensão {A.shape}, esperado ({self.size}, {self.size})")
+        self.dtype = np.dtype(dtype) if dtype is not None else self._choose_dtype(A)
+        self.A = np.ascontiguousarray(A, dtype=self.dtype)
+        
+        # Matriz simétrica S = A + A^T com diagonal zerada, usada no cálculo das contribuições.
+        # O sinal da função objetivo já é aplicado aqui, então os custos incrementais não o repetem.
+        self.S = self.SIGN * (self.A + self.A.T)
+        np.fill_diagonal(self.S, 0.0)
+        self.diag = self.SIGN * np.diag(self.A)
+        
+        # Variáveis e vetor S @ variables, mantido incrementalmente
+        self.reset_variables()
+    
+    @classmethod
+    def _choose_dtype(cls, A: np.ndarray) -> np.dtype:
+        """
+        Escolhe o tipo de armazenamento da matriz.
+        
+        Usa float32 (metade do tráfego de memória) quando A só tem valores inteiros
+        e a soma dos módulos fica abaixo de 2^24, o que garante que toda soma parcial
+        calculada em float32 é exata. Caso contrário, usa float64.
+        
+        Args:
+            A (np.ndarray): Matriz lida do arquivo
+            
+        Returns:
+            np.dtype: Tipo numérico escolhido
+        """
+        if np.array_equal(A, np.round(A)) and np.abs(A).sum() < cls.FLOAT32_EXACT_LIMIT:
+            return np.dtype(np.float32)
+        return np.dtype(np.float64)
     
     def _read_input(self, filename: str) -> int:
         """
@@ -38,72 +90,115 @@ class QBF(Evaluator):
             int: Dimensão da matriz (número de variáveis)
         """
         try:
-            print(f"Lendo arquivo: {filename}")
-            
-            with open(filename, 'r') as file:
-                lines = [line.strip() for line in file.readlines() if line.strip()]
+            # Lê a flag uma única vez; avisos e erros são sempre impressos
+            verbose = self.VERBOSE
+            if verbose:
+                print(f"Lendo arquivo: {filename}")
             
-            print(f"Arquivo lido: {len(lines)} linhas")
-            
-            if not lines:
-                raise ValueError("Arquivo vazio")
-            
-            # Primeira linha é o tamanho
-            n = int(lines[0])
-            print(f"Dimensão da matriz: {n}")
-            
-            # SEMPRE inicializa a matriz
-            self.A = [[0.0] * n for _ in range(n)]
-            print("Matriz inicializada com zeros")
-            
-            # Verifica se temos linhas suficientes
-            if len(lines) < n + 1:
-                print(f"AVISO: Arquivo tem apenas {len(lines)} linhas, esperado pelo menos {n+1}")
-                return n
-            
-            # Lê a matriz triangular superior
-            line_idx = 1
-            for i in range(n):
-                if line_idx >= len(lines):
-                    print(f"AVISO: Linha {line_idx} não encontrada, usando zeros para linha {i}")
-                    break
+            # Lê o arquivo em fluxo, linha a linha, com buffer grande, sem
+            # materializar a lista de linhas
+            with open(filename, 'r', buffering=self.READ_BUFFER_SIZE) as file:
+                lines = (line for line in map(str.strip, file) if line)
                 
-                try:
-                    values = list(map(float, lines[line_idx].split()))
-                    expected_elements = n - i
-                    
-                    if i < 5:  # Debug apenas primeiras linhas
-                        print(f"Linha {i}: {len(values)} elementos (esperado {expected_elements})")
-                    
-                    # Preenche a matriz triangular superior
-                    for j, val in enumerate(values):
-                        col_idx = i + j
-                        if col_idx < n:
-                            self.A[i][col_idx] = val
-                            # Parte inferior fica zero (não simétrica)
-                            if col_idx != i:
-                                self.A[col_idx][i] = 0.0
+                # Primeira linha é o tamanho
+                first_line = next(lines, None)
+                if first_line is None:
+                    raise ValueError("Arquivo vazio")
+                n = int(first_line)
+                if verbose:
+                    print(f"Dimensão da matriz: {n}")
                 
-                except ValueError as e:
-                    print(f"Erro ao converter linha {i}: {e}")
+                # SEMPRE inicializa a matriz
+                self.A = np.zeros((n, n), dtype=np.float64)
+                if verbose:
+                    print("Matriz inicializada com zeros")
                 
-                line_idx += 1
+                # Lê a matriz triangular superior
+                line_idx = 1
+                for i in range(n):
+                    line = next(lines, None)
+                    if line is None:
+                        print(f"AVISO: Linha {line_idx} não encontrada, usando zeros para linha {i}")
+                        break
+                    
+                    try:
+                        # Converte apenas os n - i primeiros valores; o excedente
+                        # de linhas longas nem chega a ser separado
+                        expected_elements = n - i
+                        values = np.array(line.split(None, expected_elements)[:expected_elements],
+                                          dtype=np.float64)
+                        
+                        # Preenche a matriz triangular superior (parte inferior já é zero)
+                        self.A[i, i:i + len(values)] = values
+                    
+                    except ValueError as e:
+                        print(f"Erro ao converter linha {i}: {e}")
+                    
+                    line_idx += 1
             
-            print("Matriz carregada com sucesso")
+            if verbose:
+                print("Matriz carregada com sucesso")
             return n
             
         except FileNotFoundError:
             print(f"ERRO: Arquivo '{filename}' não encontrado!")
-            self.A = [[0.0]]
+            self.A = np.zeros((1, 1), dtype=np.float64)
             return 1
         except Exception as e:
             print(f"ERRO ao ler arquivo {filename}: {e}")
-            self.A = [[0.0]]
+            self.A = np.zeros((1, 1), dtype=np.float64)
             return 1
     
+    def clone(self) -> 'QBF':
+        """
+        Cria um avaliador que compartilha os dados da instância (A, S, diag e
+        estruturas de subclasses, usados apenas para leitura), mas com variáveis
+        próprias.
+        
+        Returns:
+            QBF: Nova instância pronta para uso, com variáveis iguais a um
+        """
+        other = copy.copy(self)
+        other.reset_variables()
+        return other
+    
     def reset_variables(self):
         """Reset das variáveis para um."""
-        self.variables = [1.0] * self.size
+        self.variables = np.ones(self.size, dtype=self.dtype)
+        self.Sv = self.S @ self.variables
+        self._invalidate_variables_stamp()
+    
+    def _invalidate_variables_stamp(self):
+        """Descarta a marcação de qual solução as variáveis representam."""
+        self._stamp_solution = None
+        self._stamp_version = None
+    
+    def flip_variable(self, i: int, new_val: float):
+        """
+        Altera o valor de uma variável atualizando S @ variables em O(n).
+        
+        Args:
+            i (int): Índice da variável
+            new_val (float): Novo valor da variável
+        """
+        delta = new_val - self.variables[i]
+        if delta != 0.0:
+            # S é simétrica: a linha i é igual à coluna i e é contígua na memória
+            self.Sv += delta * self.S[i]
+            self.variables[i] = new_val
+            self._invalidate_variables_stamp()
+            self._on_variables_changed(np.array([i]), np.array([delta]))
+    
+    def _on_variables_changed(self, changed: np.ndarray, delta: np.ndarray):
+        """
+        Chamado após a alteração de variáveis, para que subclasses atualizem
+        estruturas derivadas delas. A QBF não mantém nenhuma além de S @ variables.
+        
+        Args:
+            changed (np.ndarray): Índices das variáveis alteradas
+            delta (np.ndarray): Variação (novo - antigo) de cada variável alterada
+        """
+        pass
     
     def set_variables(self, solution: Solution):
         """
@@ -114,11 +209,27 @@ class QBF(Evaluator):
         Args:
             solution (Solution): Solução atual
         """
-        self.reset_variables()
+        # Se as variáveis já representam esta solução (mesmo objeto, mesma versão), nada a fazer
+        version = getattr(solution, '_version', None)
+        if version is not None and solution is self._stamp_solution and version == self._stamp_version:
+            return
+        
+        new_variables = np.ones(self.size, dtype=self.dtype)
         if solution:
-            for elem in solution:
-                if 0 <= elem < self.size:
-                    self.variables[elem] = 0.0
+            idx = np.fromiter(solution, dtype=np.intp, count=len(solution))
+            idx = idx[(idx >= 0) & (idx < self.size)]
+            new_variables[idx] = 0.0
+        
+        # Atualiza S @ variables apenas nas linhas (= colunas, S é simétrica) das variáveis que mudaram
+        changed = np.flatnonzero(new_variables != self.variables)
+        if changed.size:
+            delta = new_variables[changed] - self.variables[changed]
+            self.Sv += delta @ self.S[changed]
+            self.variables = new_variables
+            self._on_variables_changed(changed, delta)
+        
+        self._stamp_solution = solution
+        self._stamp_version = version
     
     def get_domain_size(self) -> int:
         """
@@ -145,22 +256,18 @@ class QBF(Evaluator):
     
     def _evaluate_qbf(self) -> float:
         """
-        Calcula f(x) = x^T * A * x.
+        Calcula f(x) = x^T * A * x em O(n) a partir de S @ variables, mantido
+        incrementalmente: como S = A + A^T sem a diagonal e x é binário,
+        x^T * A * x = x . (S @ x) / 2 + diag(A) . x (com o sinal já aplicado).
+        
+        Os produtos são acumulados em float64, então o resultado é exato
+        sempre que o armazenamento em float32 for.
         
         Returns:
             float: Valor da função QBF
         """
-        total = 0.0
-        vec_aux = [0.0] * self.size
-        
-        for i in range(self.size):
-            aux = 0.0
-            for j in range(self.size):
-                aux += self.variables[j] * self.A[i][j]
-            vec_aux[i] = aux
-            total += aux * self.variables[i]
-        
-        return total
+        x = self.variables.astype(np.float64)
+        return 0.5 * float(x @ self.Sv) + float(x @ self.diag)
     
     def evaluate_insertion_cost(self, elem: int, solution: Solution) -> float:
         """
@@ -176,6 +283,19 @@ class QBF(Evaluator):
         self.set_variables(solution)
         return self._evaluate_removal_qbf(elem)
     
+    def evaluate_all_insertion_costs(self, solution: Solution) -> np.ndarray:
+        """
+        Avalia o custo de inserção de todos os elementos do domínio de uma só vez.
+        
+        Args:
+            solution (Solution): Solução atual
+            
+        Returns:
+            np.ndarray: Vetor com o custo de inserção de cada elemento
+        """
+        self.set_variables(solution)
+        return self._evaluate_all_removal_qbf()
+    
     def _evaluate_insertion_qbf(self, i: int) -> float:
         """
         Calcula o custo de inserção incremental.
@@ -204,6 +324,19 @@ class QBF(Evaluator):
         self.set_variables(solution)
         return self._evaluate_insertion_qbf(elem)
     
+    def evaluate_all_removal_costs(self, solution: Solution) -> np.ndarray:
+        """
+        Avalia o custo de remoção de todos os elementos do domínio de uma só vez.
+        
+        Args:
+            solution (Solution): Solução atual
+            
+        Returns:
+            np.ndarray: Vetor com o custo de remoção de cada elemento
+        """
+        self.set_variables(solution)
+        return self._evaluate_all_insertion_qbf()
+    
     def _evaluate_removal_qbf(self, i: int) -> float:
         """
         Calcula o custo de remoção incremental.
@@ -218,6 +351,26 @@ class QBF(Evaluator):
             return 0.0
         return -self._evaluate_contribution_qbf(i)
     
+    def _evaluate_all_insertion_qbf(self) -> np.ndarray:
+        """
+        Calcula o custo de inserção incremental de todos os elementos.
+        
+        Returns:
+            np.ndarray: Custos de inserção (zero para variáveis já iguais a um)
+        """
+        contributions = self.Sv + self.diag
+        return np.where(self.variables == 1.0, 0.0, contributions)
+    
+    def _evaluate_all_removal_qbf(self) -> np.ndarray:
+        """
+        Calcula o custo de remoção incremental de todos os elementos.
+        
+        Returns:
+            np.ndarray: Custos de remoção (zero para variáveis já nulas)
+        """
+        contributions = self.Sv + self.diag
+        return np.where(self.variables == 0.0, 0.0, -contributions)
+    
     def evaluate_exchange_cost(self, elem_in: int, elem_out: int, solution: Solution) -> float:
         """
         Avalia o custo de trocar dois elementos. O elemento a entrar é definido como 0 e o elemento a sair como 1.
@@ -254,13 +407,49 @@ class QBF(Evaluator):
         total = 0.0
         total += self._evaluate_contribution_qbf(elem_in)
         total -= self._evaluate_contribution_qbf(elem_out)
-        total -= (self.A[elem_in][elem_out] + self.A[elem_out][elem_in])
+        total -= self.S[elem_in, elem_out]
         
         return total
     
+    def evaluate_all_exchange_costs(self, elems_in: List[int], elems_out: List[int],
+                                    solution: Solution) -> np.ndarray:
+        """
+        Avalia o custo de todas as trocas entre elems_in e elems_out de uma só vez.
+        
+        Args:
+            elems_in (List[int]): Elementos a entrar (fora da solução)
+            elems_out (List[int]): Elementos a sair (na solução)
+            solution (Solution): Solução atual
+            
+        Returns:
+            np.ndarray: Matriz de custos indexada por [entrada, saída]
+        """
+        self.set_variables(solution)
+        elems_in = np.asarray(elems_in, dtype=np.intp)
+        elems_out = np.asarray(elems_out, dtype=np.intp)
+        return self._evaluate_all_exchange_qbf(elems_out, elems_in).T
+    
+    def _evaluate_all_exchange_qbf(self, elems_in: np.ndarray, elems_out: np.ndarray) -> np.ndarray:
+        """
+        Calcula o custo de troca incremental para todos os pares, supondo
+        variáveis de elems_in iguais a zero e de elems_out iguais a um.
+        
+        Args:
+            elems_in (np.ndarray): Elementos a entrar
+            elems_out (np.ndarray): Elementos a sair
+            
+        Returns:
+            np.ndarray: Matriz de custos indexada por [entrada, saída]
+        """
+        contributions = self.Sv + self.diag
+        return (contributions[elems_in][:, np.newaxis]
+                - contributions[elems_out][np.newaxis, :]
+                - self.S[np.ix_(elems_in, elems_out)])
+    
     def _evaluate_contribution_qbf(self, i: int) -> float:
         """
         Calcula a contribuição de um elemento para a função objetivo.
+        A matriz é validada no carregamento; i deve estar em [0, size).
         
         Args:
             i (int): Índice do elemento
@@ -268,31 +457,7 @@ class QBF(Evaluator):
         Returns:
             float: Contribuição do elemento
         """
-        if self.A is None:
-            print("ERRO: Matriz A é None!")
-            return 0.0
-        
-        if not (0 <= i < self.size):
-            print(f"ERRO: Índice {i} fora do range [0, {self.size-1}]")
-            return 0.0
-        
-        total = 0.0
-        
-        for j in range(self.size):
-            if i != j:
-                try:
-                    total += self.variables[j] * (self.A[i][j] + self.A[j][i])
-                except (IndexError, TypeError) as e:
-                    print(f"ERRO ao acessar A[{i}][{j}] ou A[{j}][{i}]: {e}")
-                    return 0.0
-        
-        try:
-            total += self.A[i][i]
-        except (IndexError, TypeError) as e:
-            print(f"ERRO ao acessar A[{i}][{i}]: {e}")
-            return 0.0
-        
-        return total
+        return float(self.Sv[i] + self.diag[i])
     
     def print_matrix_info(self):
         """Imprime informações sobre a matriz para debug."""
@@ -329,50 +494,9 @@ class QBFInverse(QBF):
     """
     Versão inversa da QBF para uso em algoritmos de minimização.
     Multiplica todos os valores por -1.
-    """
-    
-    def _evaluate_qbf(self) -> float:
-        """
-        Avalia a QBF inversa.
-        
-        Returns:
-            float: Valor negativo da QBF original
-        """
-        return -super()._evaluate_qbf()
-    
-    def _evaluate_insertion_qbf(self, i: int) -> float:
-        """
-        Avalia inserção na QBF inversa.
-        
-        Args:
-            i (int): Índice do elemento
-            
-        Returns:
-            float: Custo de inserção invertido
-        """
-        return -super()._evaluate_insertion_qbf(i)
     
-    def _evaluate_removal_qbf(self, i: int) -> float:
-        """
-        Avalia remoção na QBF inversa.
-        
-        Args:
-            i (int): Índice do elemento
-            
-        Returns:
-            float: Custo de remoção invertido
-        """
-        return -super()._evaluate_removal_qbf(i)
+    O sinal é incorporado em S e na diagonal no carregamento, portanto não há
+    nenhum custo adicional por avaliação em relação à QBF.
+    """
     
-    def _evaluate_exchange_qbf(self, elem_in: int, elem_out: int) -> float:
-        """
-        Avalia troca na QBF inversa.
-        
-        Args:
-            elem_in (int): Elemento a entrar
-            elem_out (int): Elemento a sair
-            
-        Returns:
-            float: Custo de troca invertido
-        """
-        return -super()._evaluate_exchange_qbf(elem_in, elem_out)
+    SIGN = -1.0
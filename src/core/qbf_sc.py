@@ -1,10 +1,86 @@
+import os
 from core.qbf import QBFInverse
-from typing import List
+from functools import lru_cache
+from typing import List, Optional
+
+import numpy as np
+
+__all__ = ['QBFSCInverse', 'load_qbf_sc']
 
 class QBFSCInverse(QBFInverse):
-    def __init__(self, filename: str):
+    def __init__(self, filename: str, dtype=None):
         self.sets = []
-        super().__init__(filename)
+        self.sets_indptr = None
+        super().__init__(filename, dtype)
+        self._build_sets_csr()
+        self._recount_coverage()
+
+    def _build_sets_csr(self):
+        """
+        Empacota os conjuntos no formato CSR (sets_indptr, sets_data), permitindo
+        contar coberturas com operações vetorizadas.
+        """
+        sizes = [len(self.sets[i]) if i < len(self.sets) else 0 for i in range(self.size)]
+        self.sets_indptr = np.zeros(self.size + 1, dtype=np.intp)
+        np.cumsum(sizes, out=self.sets_indptr[1:])
+        if self.sets[:self.size]:
+            self.sets_data = np.concatenate(self.sets[:self.size]).astype(np.intp)
+        else:
+            self.sets_data = np.zeros(0, dtype=np.intp)
+        # Conjunto (variável) ao qual pertence cada posição de sets_data
+        self.sets_owner = np.repeat(np.arange(self.size), sizes)
+        self.max_elem = int(self.sets_data.max()) if self.sets_data.size else 0
+        
+        # CSR inverso: conjuntos que contêm cada elemento
+        order = np.argsort(self.sets_data, kind='stable')
+        self.elem_sets = self.sets_owner[order]
+        self.elem_indptr = np.zeros(self.max_elem + 2, dtype=np.intp)
+        np.cumsum(np.bincount(self.sets_data, minlength=self.max_elem + 1), out=self.elem_indptr[1:])
+
+    def _recount_coverage(self):
+        """
+        Recalcula do zero quantas vezes cada elemento é coberto pelos conjuntos
+        habilitados (variáveis iguais a 1) e, para cada conjunto, quantos dos
+        seus elementos são cobertos exatamente uma vez.
+        """
+        enabled = self.variables == 1.0
+        self.element_coverage_count = np.bincount(self.sets_data[enabled[self.sets_owner]],
+                                                  minlength=self.max_elem + 1)
+        
+        covered_once = np.concatenate(([0], np.cumsum(self.element_coverage_count[self.sets_data] == 1)))
+        self.set_blocking_count = covered_once[self.sets_indptr[1:]] - covered_once[self.sets_indptr[:-1]]
+
+    def reset_variables(self):
+        """Reset das variáveis para um, recontando a cobertura dos elementos."""
+        super().reset_variables()
+        # Durante a construção da QBF os conjuntos ainda não foram empacotados
+        if self.sets_indptr is not None:
+            self._recount_coverage()
+
+    def _on_variables_changed(self, changed: np.ndarray, delta: np.ndarray):
+        """
+        Atualiza a cobertura dos elementos apenas para os conjuntos cujas
+        variáveis mudaram (em geral um ou dois por movimento), e a contagem de
+        bloqueio apenas dos conjuntos que contêm elementos que passaram a ser
+        (ou deixaram de ser) cobertos exatamente uma vez.
+        
+        Args:
+            changed (np.ndarray): Índices das variáveis alteradas
+            delta (np.ndarray): Variação (novo - antigo) de cada variável alterada
+        """
+        coverage = self.element_coverage_count
+        for i, d in zip(changed.tolist(), delta.tolist()):
+            elements = self.sets_data[self.sets_indptr[i]:self.sets_indptr[i + 1]]
+            was_once = coverage[elements] == 1
+            
+            # Os elementos de um conjunto são distintos, então a soma indexada é segura
+            coverage[elements] += int(d)
+            is_once = coverage[elements] == 1
+
+            flipped = was_once != is_once
+            for e, now_once in zip(elements[flipped].tolist(), is_once[flipped].tolist()):
+                # Os conjuntos que contêm um elemento também são distintos
+                self.set_blocking_count[self.elem_sets[self.elem_indptr[e]:self.elem_indptr[e + 1]]] += 1 if now_once else -1
 
     def _read_input(self, filename: str) -> int:
         """
@@ -17,110 +93,125 @@ class QBFSCInverse(QBFInverse):
             int: Dimensão da matriz (número de variáveis)
         """
         try:
-            print(f"Lendo arquivo: {filename}")
-            
-            with open(filename, 'r') as file:
-                lines = [line.strip() for line in file.readlines() if line.strip()]
+            # Lê a flag uma única vez; avisos e erros são sempre impressos
+            verbose = self.VERBOSE
+            if verbose:
+                print(f"Lendo arquivo: {filename}")
             
-            print(f"Arquivo lido: {len(lines)} linhas")
-            
-            if not lines:
-                raise ValueError("Arquivo vazio")
-            
-            # Primeira linha é o tamanho
-            n = int(lines[0])
-            print(f"Dimensão da matriz: {n}")
-            
-            # SEMPRE inicializa a matriz
-            self.A = [[0.0] * n for _ in range(n)]
-            print("Matriz inicializada com zeros")
-
-            # Inicializa lista de conjuntos para as restrições de set-cover
-            self.sets = []
-            
-            # Verifica se temos linhas suficientes
-            if len(lines) <  2 * (n + 1):
-                print(f"AVISO: Arquivo tem apenas {len(lines)} linhas, esperado pelo menos {2*(n+1)}")
-                return n
-            
-            # Lê as restrições de set-cover
-            line_idx = 2 # Podemos pular a segunda linha, que tem os tamanhos dos conjuntos
-            for i in range(n):
-                if line_idx >= len(lines):
-                    print(f"AVISO: Linha {line_idx} não encontrada, conjuntos podem estar incompletos")
-                    break
+            # Lê o arquivo em fluxo, linha a linha, com buffer grande, sem
+            # materializar a lista de linhas
+            with open(filename, 'r', buffering=self.READ_BUFFER_SIZE) as file:
+                lines = (line for line in map(str.strip, file) if line)
                 
-                try:
-                    self.sets.append(set(map(int, lines[line_idx].split())))
-                except ValueError as e:
-                    raise ValueError(f"Erro ao processar linha {line_idx}: {e}") from e
+                # Primeira linha é o tamanho
+                first_line = next(lines, None)
+                if first_line is None:
+                    raise ValueError("Arquivo vazio")
+                n = int(first_line)
+                if verbose:
+                    print(f"Dimensão da matriz: {n}")
                 
-                line_idx += 1
-
-            print(f"{len(self.sets)} conjuntos lidos")
-            
-            # Lê a matriz triangular superior
-            for i in range(n):
-                if line_idx >= len(lines):
-                    print(f"AVISO: Linha {line_idx} não encontrada, usando zeros para linha {i}")
-                    break
+                # SEMPRE inicializa a matriz
+                self.A = np.zeros((n, n), dtype=np.float64)
+                if verbose:
+                    print("Matriz inicializada com zeros")
+                
+                # Inicializa lista de conjuntos para as restrições de set-cover
+                self.sets = []
+                
+                # Podemos pular a segunda linha, que tem os tamanhos dos conjuntos
+                next(lines, None)
                 
-                try:
-                    values = list(map(float, lines[line_idx].split()))
-                    expected_elements = n - i
+                # Lê as restrições de set-cover
+                line_idx = 2
+                for i in range(n):
+                    line = next(lines, None)
+                    if line is None:
+                        print(f"AVISO: Linha {line_idx} não encontrada, conjuntos podem estar incompletos")
+                        break
                     
-                    if i < 5:  # Debug apenas primeiras linhas
-                        print(f"Linha {i}: {len(values)} elementos (esperado {expected_elements})")
+                    try:
+                        # Conjunto como vetor ordenado e sem repetições
+                        self.sets.append(np.unique(np.array(line.split(), dtype=np.int32)))
+                    except ValueError as e:
+                        raise ValueError(f"Erro ao processar linha {line_idx}: {e}") from e
                     
-                    # Preenche a matriz triangular superior
-                    for j, val in enumerate(values):
-                        col_idx = i + j
-                        if col_idx < n:
-                            self.A[i][col_idx] = val
-                            # Parte inferior fica zero (não simétrica)
-                            if col_idx != i:
-                                self.A[col_idx][i] = 0.0
+                    line_idx += 1
                 
-                except ValueError as e:
-                    raise ValueError(f"Erro ao processar linha {line_idx}: {e}") from e
+                if verbose:
+                    print(f"{len(self.sets)} conjuntos lidos")
                 
-                line_idx += 1
+                # Lê a matriz triangular superior
+                for i in range(n):
+                    line = next(lines, None)
+                    if line is None:
+                        print(f"AVISO: Linha {line_idx} não encontrada, usando zeros para linha {i}")
+                        break
+                    
+                    try:
+                        # Converte apenas os n - i primeiros valores; o excedente
+                        # de linhas longas nem chega a ser separado
+                        expected_elements = n - i
+                        values = np.array(line.split(None, expected_elements)[:expected_elements],
+                                          dtype=np.float64)
+                        
+                        # Preenche a matriz triangular superior (parte inferior já é zero)
+                        self.A[i, i:i + len(values)] = values
+                    
+                    except ValueError as e:
+                        raise ValueError(f"Erro ao processar linha {line_idx}: {e}") from e
+                    
+                    line_idx += 1
             
-            print("Matriz carregada com sucesso")
+            if verbose:
+                print("Matriz carregada com sucesso")
             return n
             
         except FileNotFoundError:
             print(f"ERRO: Arquivo '{filename}' não encontrado!")
-            self.A = [[0.0]]
+            self.A = np.zeros((1, 1), dtype=np.float64)
             return 1
         except Exception as e:
             print(f"ERRO ao ler arquivo {filename}: {e}")
-            self.A = [[0.0]]
+            self.A = np.zeros((1, 1), dtype=np.float64)
             return 1
         
     def get_variables_that_can_be_set_to_zero(self) -> List[int]:
         # Conjuntos de 0 ate N-1
         # Isso irá listar todos os conjuntos que ainda estão sendo usados para cobrir os elementos
-        set_indexes_enabled = [i for i in range(self.size) if self.variables[i] == 1.0]
+        enabled = self.variables == 1.0
 
-        # Contar quantas vezes cada elemento (variável) é coberto
-        element_coverage_count = {}
-        for set_index in set_indexes_enabled:
-            for elem in self.sets[set_index]:
-                element_coverage_count[elem] = element_coverage_count.get(elem, 0) + 1
+        # Se definirmos a variável i como 0, desabilitamos um conjunto
+        # Se houver elementos no conjunto que são cobertos apenas uma vez, eles não serão mais cobertos
+        # Portanto, não podemos definir essa variável como 0
+        # (a contagem desses elementos por conjunto é mantida incrementalmente
+        # a cada alteração das variáveis)
+        return np.flatnonzero(enabled & (self.set_blocking_count == 0)).tolist()
 
-        variables_that_can_be_set_to_zero = []
-        for i in range(self.size):
-            if self.variables[i] == 1.0:
-                can_be_set_to_zero = True
-                for elem in self.sets[i]:
-                    # Se definirmos a variável i como 0, desabilitamos um conjunto
-                    # Se houver elementos no conjunto que são cobertos apenas uma vez, eles não serão mais cobertos
-                    # Portanto, não podemos definir essa variável como 0
-                    if element_coverage_count.get(elem, 0) == 1:
-                        can_be_set_to_zero = False
-                        break
-                if can_be_set_to_zero:
-                    variables_that_can_be_set_to_zero.append(i)
 
-        return variables_that_can_be_set_to_zero
+@lru_cache(maxsize=8)
+def _read_qbf_sc(filename: str, mtime: Optional[float]) -> QBFSCInverse:
+    """Lê e interpreta a instância uma única vez por arquivo e versão (mtime)."""
+    return QBFSCInverse(filename)
+
+
+def load_qbf_sc(filename: str) -> QBFSCInverse:
+    """
+    Retorna um avaliador QBF-SC para o arquivo, reaproveitando a leitura já feita
+    em execuções anteriores (outras seeds, tenures ou métodos no mesmo processo).
+    
+    A data de modificação do arquivo faz parte da chave do cache, então um
+    arquivo alterado é lido de novo.
+    
+    Args:
+        filename (str): Arquivo da instância
+        
+    Returns:
+        QBFSCInverse: Avaliador com variáveis próprias
+    """
+    try:
+        mtime = os.path.getmtime(filename)
+    except OSError:
+        # O leitor da QBF reporta o erro de arquivo
+        mtime = None
+    return _read_qbf_sc(filename, mtime).clone()
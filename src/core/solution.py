@@ -5,12 +5,18 @@ Classe Solution para representar soluções no Tabu Search.
 Herda de list para compatibilidade com operações de lista.
 """
 
+from collections import Counter
+
+
 class Solution(list):
     """
     Classe que representa uma solução para problemas de otimização.
     Herda de list para permitir operações como append, remove, etc.
     """
     
+    # Sem __dict__ por instância: o TS cria muitas cópias de soluções
+    __slots__ = ('cost', '_members', '_version')
+    
     def __init__(self, solution=None):
         """
         Inicializa uma nova solução.
@@ -21,6 +27,13 @@ class Solution(list):
         super().__init__()
         self.cost = float('inf')
         
+        # Contagem auxiliar dos elementos, para testes de pertinência em O(1).
+        # Conta repetições, para que remover uma cópia não esconda as demais.
+        self._members = Counter()
+        
+        # Versão incrementada a cada modificação (permite que avaliadores reutilizem estado)
+        self._version = 0
+        
         if solution is not None:
             self.extend(solution)
             self.cost = solution.cost if hasattr(solution, 'cost') else float('inf')
@@ -32,7 +45,23 @@ class Solution(list):
         Returns:
             Solution: Nova instância com os mesmos elementos e custo
         """
-        return Solution(self)
+        new_sol = Solution()
+        list.extend(new_sol, self)
+        new_sol._members = self._members.copy()
+        new_sol.cost = self.cost
+        return new_sol
+    
+    def __reduce__(self):
+        """
+        Serializa a solução reconstruindo-a pelo construtor.
+        
+        O pickle padrão de subclasses de list chama extend antes de restaurar
+        os slots, quando a contagem auxiliar ainda não existe.
+        
+        Returns:
+            tuple: Classe, argumentos do construtor e estado dos slots
+        """
+        return (Solution, (list(self),), (None, {'cost': self.cost}))
     
     def is_empty(self):
         """
@@ -80,7 +109,7 @@ class Solution(list):
         Returns:
             bool: True se o elemento está presente
         """
-        return element in self
+        return element in self._members
     
     def add_element(self, element):
         """
@@ -89,7 +118,7 @@ class Solution(list):
         Args:
             element: Elemento a ser adicionado
         """
-        if element not in self:
+        if element not in self._members:
             self.append(element)
     
     def remove_element(self, element):
@@ -102,11 +131,176 @@ class Solution(list):
         Returns:
             bool: True se o elemento foi removido, False se não estava presente
         """
-        if element in self:
+        if element in self._members:
             self.remove(element)
             return True
         return False
     
+    def __contains__(self, element):
+        """
+        Verifica pertinência usando a contagem auxiliar.
+        
+        Args:
+            element: Elemento a ser verificado
+            
+        Returns:
+            bool: True se o elemento está presente
+        """
+        return element in self._members
+    
+    def append(self, element):
+        """
+        Adiciona um elemento ao final da solução mantendo a contagem auxiliar.
+        
+        Args:
+            element: Elemento a ser adicionado
+        """
+        super().append(element)
+        self._members[element] += 1
+        self._version += 1
+    
+    def extend(self, elements):
+        """
+        Adiciona vários elementos mantendo a contagem auxiliar.
+        
+        Args:
+            elements: Elementos a serem adicionados
+        """
+        elements = list(elements)
+        super().extend(elements)
+        self._members.update(elements)
+        self._version += 1
+    
+    def remove(self, element):
+        """
+        Remove um elemento mantendo a contagem auxiliar.
+        
+        Args:
+            element: Elemento a ser removido
+        """
+        super().remove(element)
+        self._discard_members((element,))
+        self._version += 1
+    
+    def clear(self):
+        """Remove todos os elementos da solução."""
+        super().clear()
+        self._members.clear()
+        self._version += 1
+    
+    def insert(self, index, element):
+        """
+        Insere um elemento na posição indicada mantendo a contagem auxiliar.
+        
+        Args:
+            index (int): Posição de inserção
+            element: Elemento a ser inserido
+        """
+        super().insert(index, element)
+        self._members[element] += 1
+        self._version += 1
+    
+    def pop(self, index=-1):
+        """
+        Remove e retorna o elemento na posição indicada mantendo a contagem auxiliar.
+        
+        Args:
+            index (int): Posição do elemento (padrão: último)
+            
+        Returns:
+            Elemento removido
+        """
+        element = super().pop(index)
+        self._discard_members((element,))
+        self._version += 1
+        return element
+    
+    def __setitem__(self, index, value):
+        """
+        Substitui um elemento (ou uma fatia) mantendo a contagem auxiliar.
+        
+        Args:
+            index: Posição ou fatia
+            value: Novo elemento (ou elementos, para fatias)
+        """
+        if isinstance(index, slice):
+            value = list(value)
+            removed, added = list.__getitem__(self, index), value
+        else:
+            removed, added = (list.__getitem__(self, index),), (value,)
+        super().__setitem__(index, value)
+        self._members.update(added)
+        self._discard_members(removed)
+        self._version += 1
+    
+    def __delitem__(self, index):
+        """
+        Remove um elemento (ou uma fatia) mantendo a contagem auxiliar.
+        
+        Args:
+            index: Posição ou fatia
+        """
+        removed = list.__getitem__(self, index)
+        if not isinstance(index, slice):
+            removed = (removed,)
+        super().__delitem__(index)
+        self._discard_members(removed)
+        self._version += 1
+    
+    def __iadd__(self, elements):
+        """
+        Implementa solution += elements através de extend.
+        
+        Args:
+            elements: Elementos a serem adicionados
+            
+        Returns:
+            Solution: A própria solução
+        """
+        self.extend(elements)
+        return self
+    
+    def __imul__(self, times):
+        """
+        Implementa solution *= times mantendo a contagem auxiliar.
+        
+        Args:
+            times (int): Número de repetições
+            
+        Returns:
+            Solution: A própria solução
+        """
+        if times <= 0:
+            self.clear()
+        else:
+            self.extend(list(self) * (times - 1))
+        return self
+    
+    def _discard_members(self, elements):
+        """
+        Desconta elementos retirados da lista; um elemento só deixa o conjunto
+        auxiliar quando não resta nenhuma cópia dele.
+        
+        Args:
+            elements: Elementos retirados
+        """
+        members = self._members
+        for element in elements:
+            count = members[element] - 1
+            if count > 0:
+                members[element] = count
+            else:
+                del members[element]
+    
+    def get_version(self):
+        """
+        Retorna a versão da solução, incrementada a cada modificação.
+        
+        Returns:
+            int: Versão atual
+        """
+        return self._version
+    
     def get_elements(self):
         """
         Retorna uma cópia da lista de elementos.
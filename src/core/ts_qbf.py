@@ -6,12 +6,35 @@ Implementação especializada do Tabu Search para o problema QBF.
 """
 
 from collections import deque
-from typing import List, Optional
+from itertools import repeat
+from typing import List, Optional, Sequence, Tuple
 import random
 
+import numpy as np
+
 from core.abstract_ts import AbstractTabuSearch
 from core.solution import Solution
-from core.qbf import QBFInverse
+from core.qbf import QBF, QBFInverse
+
+
+def _solve_one(args) -> Tuple[float, List[int]]:
+    """
+    Executa uma busca independente (usado pelos processos do multistart).
+    
+    Args:
+        args: Tupla (classe, tenure, iterations, filename, seed, kwargs)
+        
+    Returns:
+        Tuple[float, List[int]]: Custo e elementos da melhor solução encontrada
+    """
+    cls, tenure, iterations, filename, seed, kwargs = args
+    
+    # Os processos trabalham em silêncio; só o resultado volta ao processo principal
+    QBF.VERBOSE = False
+    solver = cls(tenure, iterations, filename, seed, **kwargs)
+    solver.set_verbose(False)
+    best = solver.solve()
+    return best.cost, list(best)
 
 
 class TabuSearchQBF(AbstractTabuSearch):
@@ -39,6 +62,43 @@ class TabuSearchQBF(AbstractTabuSearch):
         # Referência tipada para facilitar acesso
         self.qbf: QBFInverse = qbf_inverse
     
+    @classmethod
+    def solve_multistart(cls, tenure: int, iterations: int, filename: str, seeds: Sequence[int],
+                         max_workers: Optional[int] = None, **kwargs) -> Solution:
+        """
+        Executa buscas independentes, uma por seed, em processos paralelos.
+        
+        Cada processo devolve apenas o custo e os elementos da sua melhor
+        solução. Em caso de empate vale a primeira seed da lista.
+        
+        Args:
+            tenure (int): Tamanho da lista tabu
+            iterations (int): Número de iterações de cada busca
+            filename (str): Arquivo com a instância QBF
+            seeds (Sequence[int]): Seeds das buscas
+            max_workers (Optional[int]): Número de processos (padrão: uma por seed)
+            **kwargs: Parâmetros extras do construtor da classe
+            
+        Returns:
+            Solution: Melhor solução entre todas as buscas
+        """
+        seeds = list(seeds)
+        if not seeds:
+            raise ValueError("É necessária pelo menos uma seed")
+        
+        # Importado sob demanda: o pool de processos só é usado pelo multistart
+        from concurrent.futures import ProcessPoolExecutor
+        
+        jobs = [(cls, tenure, iterations, filename, seed, kwargs) for seed in seeds]
+        with ProcessPoolExecutor(max_workers=max_workers or len(seeds)) as executor:
+            results = list(executor.map(_solve_one, jobs))
+        
+        best_cost, best_elements = min(results, key=lambda result: result[0])
+        best = Solution()
+        best.extend(best_elements)
+        best.cost = best_cost
+        return best
+    
     def _get_fake_element(self) -> int:
         """
         Retorna elemento fake para lista tabu.
@@ -73,10 +133,50 @@ class TabuSearchQBF(AbstractTabuSearch):
         Returns:
             deque: Lista tabu com capacidade 2*tenure preenchida com fake elements
         """
-        tabu_list = deque(maxlen=2 * self.tenure)
-        for _ in range(2 * self.tenure):
-            tabu_list.append(self.fake_element)
-        return tabu_list
+        return deque(repeat(self.fake_element, 2 * self.tenure), maxlen=2 * self.tenure)
+    
+    def _rebuild_tabu_index(self):
+        """
+        Reconstrói o contador de ocorrências e o vetor de ocorrências por
+        elemento, usado por tabu_mask.
+        """
+        super()._rebuild_tabu_index()
+        
+        size = self.obj_function.get_domain_size()
+        self._tabu_marks = np.zeros(size, dtype=np.int32)
+        if self._tabu_list is not None:
+            # O elemento fake (-1) fica fora do vetor: nunca é candidato
+            elems = np.fromiter(self._tabu_list, dtype=np.intp, count=len(self._tabu_list))
+            np.add.at(self._tabu_marks, elems[(elems >= 0) & (elems < size)], 1)
+    
+    def add_to_tabu_list(self, element: int):
+        """
+        Adiciona um elemento à lista tabu, mantendo o vetor de ocorrências.
+        
+        Args:
+            element (int): Elemento a ser adicionado
+        """
+        if self.tabu_list is not None:
+            oldest = self.tabu_list[0]
+            super().add_to_tabu_list(element)
+            
+            if oldest != self.fake_element:
+                self._tabu_marks[oldest] -= 1
+            if element != self.fake_element:
+                self._tabu_marks[element] += 1
+    
+    def tabu_mask(self, elements) -> np.ndarray:
+        """
+        Versão vetorizada de is_tabu para elementos inteiros.
+        Consulta o vetor de ocorrências indexado pelo elemento.
+        
+        Args:
+            elements: Elementos a serem verificados
+            
+        Returns:
+            np.ndarray: Máscara booleana (True se o elemento é tabu)
+        """
+        return self._tabu_marks[np.asarray(elements, dtype=np.intp)] > 0
     
     def update_candidate_list(self):
         """
@@ -110,83 +210,128 @@ class TabuSearchQBF(AbstractTabuSearch):
         
         self.update_candidate_list()
         
+        cands_in = self._get_available_candidates()
+        cands_out = np.fromiter(self.current_sol, dtype=np.intp, count=len(self.current_sol))
+        tabu_in = self.tabu_mask(cands_in)
+        tabu_out = self.tabu_mask(cands_out)
+        
         # 1. AVALIA INSERÇÕES
-        for cand_in in self.candidate_list:
-            if not self.current_sol.contains_element(cand_in):
-                delta_cost = self.obj_function.evaluate_insertion_cost(cand_in, self.current_sol)
-                
-                # Verifica se movimento é permitido (não-tabu ou satisfaz aspiração)
-                if (not self.is_tabu(cand_in) or 
-                    self.aspiration_criteria(cand_in, delta_cost)):
-                    
-                    if delta_cost < min_delta_cost:
-                        min_delta_cost = delta_cost
-                        best_cand_in = cand_in
-                        best_cand_out = None
-                        best_move_type = "insertion"
+        if cands_in.size:
+            delta_costs = np.asarray(self.obj_function.evaluate_all_insertion_costs(self.current_sol))[cands_in]
+            
+            # Movimento é permitido se não-tabu ou se satisfaz aspiração
+            allowed = ~tabu_in | self.aspiration_mask(delta_costs)
+            k, delta_cost = self._best_allowed_move(delta_costs, allowed)
+            
+            if delta_cost < min_delta_cost:
+                min_delta_cost = delta_cost
+                best_cand_in = int(cands_in[k])
+                best_cand_out = None
+                best_move_type = "insertion"
         
         # 2. AVALIA REMOÇÕES
-        for cand_out in list(self.current_sol):  # Cria cópia para evitar problemas de iteração
-            delta_cost = self.obj_function.evaluate_removal_cost(cand_out, self.current_sol)
+        if cands_out.size:
+            delta_costs = np.asarray(self.obj_function.evaluate_all_removal_costs(self.current_sol))[cands_out]
             
-            # Verifica se movimento é permitido
-            if (not self.is_tabu(cand_out) or 
-                self.aspiration_criteria(cand_out, delta_cost)):
-                
-                if delta_cost < min_delta_cost:
-                    min_delta_cost = delta_cost
-                    best_cand_in = None
-                    best_cand_out = cand_out
-                    best_move_type = "removal"
+            allowed = ~tabu_out | self.aspiration_mask(delta_costs)
+            k, delta_cost = self._best_allowed_move(delta_costs, allowed)
+            
+            if delta_cost < min_delta_cost:
+                min_delta_cost = delta_cost
+                best_cand_in = None
+                best_cand_out = int(cands_out[k])
+                best_move_type = "removal"
         
         # 3. AVALIA TROCAS (2-EXCHANGE)
-        for cand_in in self.candidate_list:
-            if not self.current_sol.contains_element(cand_in):
-                for cand_out in list(self.current_sol):
-                    delta_cost = self.obj_function.evaluate_exchange_cost(cand_in, cand_out, self.current_sol)
-                    
-                    # Para troca, ambos elementos devem ser não-tabu ou satisfazer aspiração
-                    tabu_in = self.is_tabu(cand_in)
-                    tabu_out = self.is_tabu(cand_out)
-                    aspiration = self.aspiration_criteria(cand_in, delta_cost)
-                    
-                    if (not tabu_in and not tabu_out) or aspiration:
-                        if delta_cost < min_delta_cost:
-                            min_delta_cost = delta_cost
-                            best_cand_in = cand_in
-                            best_cand_out = cand_out
-                            best_move_type = "exchange"
+        if cands_in.size and cands_out.size:
+            delta_costs = np.asarray(self.obj_function.evaluate_all_exchange_costs(cands_in, cands_out, self.current_sol))
+            
+            # Para troca, ambos elementos devem ser não-tabu ou satisfazer aspiração
+            allowed = ~(tabu_in[:, np.newaxis] | tabu_out[np.newaxis, :]) | self.aspiration_mask(delta_costs)
+            k, delta_cost = self._best_allowed_move(delta_costs, allowed)
+            
+            if delta_cost < min_delta_cost:
+                min_delta_cost = delta_cost
+                i, j = np.unravel_index(k, delta_costs.shape)
+                best_cand_in = int(cands_in[i])
+                best_cand_out = int(cands_out[j])
+                best_move_type = "exchange"
         
         # 4. IMPLEMENTA O MELHOR MOVIMENTO
         if best_move_type is None:
             # Nenhum movimento válido encontrado - isso não deveria acontecer
-            print("AVISO: Nenhum movimento válido encontrado!")
+            # Silencioso quando a saída está desligada (p. ex. nos processos do multistart)
+            if self.VERBOSE:
+                print("AVISO: Nenhum movimento válido encontrado!")
             return None
         
-        # Atualiza lista tabu e executa movimento
-        if best_move_type == "insertion":
+        self._apply_move(best_move_type, best_cand_in, best_cand_out)
+        
+        return None
+    
+    def _apply_move(self, move_type: str, cand_in: Optional[int], cand_out: Optional[int]):
+        """
+        Executa um movimento na solução atual, atualizando a lista tabu,
+        e reavalia a solução.
+        
+        Args:
+            move_type (str): "insertion", "removal" ou "exchange"
+            cand_in (Optional[int]): Elemento inserido (None na remoção)
+            cand_out (Optional[int]): Elemento removido (None na inserção)
+        """
+        if move_type == "insertion":
             # Apenas inserção
             self.add_to_tabu_list(self.fake_element)  # Nada removido
-            self.add_to_tabu_list(best_cand_in)       # Elemento inserido vira tabu
-            self.current_sol.add_element(best_cand_in)
+            self.add_to_tabu_list(cand_in)            # Elemento inserido vira tabu
+            self.current_sol.add_element(cand_in)
             
-        elif best_move_type == "removal":
+        elif move_type == "removal":
             # Apenas remoção  
-            self.add_to_tabu_list(best_cand_out)      # Elemento removido vira tabu
+            self.add_to_tabu_list(cand_out)           # Elemento removido vira tabu
             self.add_to_tabu_list(self.fake_element)  # Nada inserido
-            self.current_sol.remove_element(best_cand_out)
+            self.current_sol.remove_element(cand_out)
             
-        elif best_move_type == "exchange":
+        elif move_type == "exchange":
             # Troca: remove um e insere outro
-            self.add_to_tabu_list(best_cand_out)      # Elemento removido vira tabu
-            self.add_to_tabu_list(best_cand_in)       # Elemento inserido vira tabu
-            self.current_sol.remove_element(best_cand_out)
-            self.current_sol.add_element(best_cand_in)
+            self.add_to_tabu_list(cand_out)           # Elemento removido vira tabu
+            self.add_to_tabu_list(cand_in)            # Elemento inserido vira tabu
+            self.current_sol.remove_element(cand_out)
+            self.current_sol.add_element(cand_in)
         
         # Reavalia solução atual
         self.obj_function.evaluate(self.current_sol)
+    
+    @staticmethod
+    def _best_allowed_move(delta_costs: np.ndarray, allowed: np.ndarray):
+        """
+        Encontra o primeiro movimento permitido de menor custo.
         
-        return None
+        Args:
+            delta_costs (np.ndarray): Variações de custo dos movimentos
+            allowed (np.ndarray): Máscara dos movimentos permitidos
+            
+        Returns:
+            tuple: Índice plano do movimento e seu custo (inf se nenhum é permitido)
+        """
+        masked = np.where(allowed, delta_costs, np.inf)
+        k = int(np.argmin(masked))
+        return k, float(masked.flat[k])
+    
+    @staticmethod
+    def _first_improving_move(delta_costs: np.ndarray, allowed: np.ndarray) -> Optional[int]:
+        """
+        Encontra o primeiro movimento permitido que melhora a solução,
+        na ordem da varredura (linha a linha para matrizes).
+        
+        Args:
+            delta_costs (np.ndarray): Variações de custo dos movimentos
+            allowed (np.ndarray): Máscara dos movimentos permitidos
+            
+        Returns:
+            Optional[int]: Índice plano do movimento ou None se nenhum melhora
+        """
+        hits = np.flatnonzero(allowed & (delta_costs < 0))
+        return int(hits[0]) if hits.size else None
     
     def print_debug_info(self):
         """Imprime informações de debug sobre o estado atual."""
@@ -1,5 +1,5 @@
 from core.ts_qbf import TabuSearchQBF
-from core.qbf_sc import QBFSCInverse
+from core.qbf_sc import QBFSCInverse, load_qbf_sc
 
 class TabuSearchQBFSc(TabuSearchQBF):
     """
@@ -16,7 +16,7 @@ class TabuSearchQBFSc(TabuSearchQBF):
             filename (str): Arquivo com a instância QBF
             random_seed (int): Seed para números aleatórios
         """
-        super().__init__(tenure, iterations, filename, random_seed, qbf_inverse=QBFSCInverse(filename))
+        super().__init__(tenure, iterations, filename, random_seed, qbf_inverse=load_qbf_sc(filename))
 
     def update_candidate_list(self):
         """
@@ -8,6 +8,9 @@ Esta é a implementação do item 1: PADRÃO - Busca Tabu com método de busca f
 """
 
 from typing import Optional
+
+import numpy as np
+
 from core.ts_qbf_sc import TabuSearchQBFSc
 
 
@@ -45,62 +48,67 @@ class TabuSearchQBFScFirstImproving(TabuSearchQBFSc):
         """
         self.update_candidate_list()
         
+        cands_in = self._get_available_candidates()
+        cands_out = np.fromiter(self.current_sol, dtype=np.intp, count=len(self.current_sol))
+        
+        self._scan_first_improving(cands_in, cands_out)
+        
+        return None
+    
+    def _scan_first_improving(self, cands_in: np.ndarray, cands_out: np.ndarray):
+        """
+        Varre a vizinhança na ordem dada pelos candidatos e executa o primeiro
+        movimento permitido que melhora a solução. Se nenhum melhora, executa
+        o melhor movimento permitido.
+        
+        Os custos de cada tipo de movimento são calculados em lote e apenas
+        quando a varredura chega a ele.
+        
+        Args:
+            cands_in (np.ndarray): Candidatos à inserção, na ordem de exploração
+            cands_out (np.ndarray): Elementos da solução, na ordem de exploração
+        """
+        tabu_in = self.tabu_mask(cands_in)
+        tabu_out = self.tabu_mask(cands_out)
+        
+        insertion_costs = removal_costs = exchange_costs = None
+        
         # 1. AVALIA INSERÇÕES - FIRST-IMPROVING
-        for cand_in in self.candidate_list:
-            if not self.current_sol.contains_element(cand_in):
-                delta_cost = self.obj_function.evaluate_insertion_cost(cand_in, self.current_sol)
-                
-                # Verifica se movimento é permitido (não-tabu ou satisfaz aspiração)
-                if (not self.is_tabu(cand_in) or 
-                    self.aspiration_criteria(cand_in, delta_cost)):
-                    
-                    # FIRST-IMPROVING: aceita primeiro movimento que melhora
-                    if delta_cost < 0:  # Melhoria (custo negativo = melhoria na QBF inversa)
-                        # Executa movimento de inserção
-                        self.add_to_tabu_list(self.fake_element)  # Nada removido
-                        self.add_to_tabu_list(cand_in)           # Elemento inserido vira tabu
-                        self.current_sol.add_element(cand_in)
-                        self.obj_function.evaluate(self.current_sol)
-                        return None
+        if cands_in.size:
+            insertion_costs = np.asarray(self.obj_function.evaluate_all_insertion_costs(self.current_sol))[cands_in]
+            
+            # Movimento é permitido se não-tabu ou se satisfaz aspiração
+            insertion_allowed = ~tabu_in | self.aspiration_mask(insertion_costs)
+            
+            # FIRST-IMPROVING: aceita primeiro movimento que melhora
+            # (custo negativo = melhoria na QBF inversa)
+            k = self._first_improving_move(insertion_costs, insertion_allowed)
+            if k is not None:
+                self._apply_move("insertion", int(cands_in[k]), None)
+                return
         
         # 2. AVALIA REMOÇÕES - FIRST-IMPROVING
-        for cand_out in list(self.current_sol):  # Cria cópia para evitar problemas
-            delta_cost = self.obj_function.evaluate_removal_cost(cand_out, self.current_sol)
+        if cands_out.size:
+            removal_costs = np.asarray(self.obj_function.evaluate_all_removal_costs(self.current_sol))[cands_out]
+            removal_allowed = ~tabu_out | self.aspiration_mask(removal_costs)
             
-            # Verifica se movimento é permitido
-            if (not self.is_tabu(cand_out) or 
-                self.aspiration_criteria(cand_out, delta_cost)):
-                
-                # FIRST-IMPROVING: aceita primeiro movimento que melhora
-                if delta_cost < 0:  # Melhoria
-                    # Executa movimento de remoção
-                    self.add_to_tabu_list(cand_out)           # Elemento removido vira tabu
-                    self.add_to_tabu_list(self.fake_element)  # Nada inserido
-                    self.current_sol.remove_element(cand_out)
-                    self.obj_function.evaluate(self.current_sol)
-                    return None
+            k = self._first_improving_move(removal_costs, removal_allowed)
+            if k is not None:
+                self._apply_move("removal", None, int(cands_out[k]))
+                return
         
         # 3. AVALIA TROCAS (2-EXCHANGE) - FIRST-IMPROVING
-        for cand_in in self.candidate_list:
-            if not self.current_sol.contains_element(cand_in):
-                for cand_out in list(self.current_sol):
-                    delta_cost = self.obj_function.evaluate_exchange_cost(cand_in, cand_out, self.current_sol)
-                    
-                    # Para troca, ambos elementos devem ser não-tabu ou satisfazer aspiração
-                    tabu_in = self.is_tabu(cand_in)
-                    tabu_out = self.is_tabu(cand_out)
-                    aspiration = self.aspiration_criteria(cand_in, delta_cost)
-                    
-                    if (not tabu_in and not tabu_out) or aspiration:
-                        # FIRST-IMPROVING: aceita primeiro movimento que melhora
-                        if delta_cost < 0:  # Melhoria
-                            # Executa movimento de troca
-                            self.add_to_tabu_list(cand_out)  # Elemento removido vira tabu
-                            self.add_to_tabu_list(cand_in)   # Elemento inserido vira tabu
-                            self.current_sol.remove_element(cand_out)
-                            self.current_sol.add_element(cand_in)
-                            self.obj_function.evaluate(self.current_sol)
-                            return None
+        if cands_in.size and cands_out.size:
+            exchange_costs = np.asarray(self.obj_function.evaluate_all_exchange_costs(cands_in, cands_out, self.current_sol))
+            
+            # Para troca, ambos elementos devem ser não-tabu ou satisfazer aspiração
+            exchange_allowed = ~(tabu_in[:, np.newaxis] | tabu_out[np.newaxis, :]) | self.aspiration_mask(exchange_costs)
+            
+            k = self._first_improving_move(exchange_costs, exchange_allowed)
+            if k is not None:
+                i, j = np.unravel_index(k, exchange_costs.shape)
+                self._apply_move("exchange", int(cands_in[i]), int(cands_out[j]))
+                return
         
         # 4. SE NENHUM MOVIMENTO MELHORADOR ENCONTRADO, USA BEST-IMPROVING
         # (fallback para garantir que sempre há movimento)
@@ -109,76 +117,39 @@ class TabuSearchQBFScFirstImproving(TabuSearchQBFSc):
         best_cand_out = None
         best_move_type = None
         
-        # Reavalia inserções para encontrar o melhor movimento não-melhorador
-        for cand_in in self.candidate_list:
-            if not self.current_sol.contains_element(cand_in):
-                delta_cost = self.obj_function.evaluate_insertion_cost(cand_in, self.current_sol)
-                
-                if (not self.is_tabu(cand_in) or 
-                    self.aspiration_criteria(cand_in, delta_cost)):
-                    
-                    if delta_cost < min_delta_cost:
-                        min_delta_cost = delta_cost
-                        best_cand_in = cand_in
-                        best_cand_out = None
-                        best_move_type = "insertion"
-        
-        # Reavalia remoções
-        for cand_out in list(self.current_sol):
-            delta_cost = self.obj_function.evaluate_removal_cost(cand_out, self.current_sol)
-            
-            if (not self.is_tabu(cand_out) or 
-                self.aspiration_criteria(cand_out, delta_cost)):
-                
-                if delta_cost < min_delta_cost:
-                    min_delta_cost = delta_cost
-                    best_cand_in = None
-                    best_cand_out = cand_out
-                    best_move_type = "removal"
-        
-        # Reavalia trocas
-        for cand_in in self.candidate_list:
-            if not self.current_sol.contains_element(cand_in):
-                for cand_out in list(self.current_sol):
-                    delta_cost = self.obj_function.evaluate_exchange_cost(cand_in, cand_out, self.current_sol)
-                    
-                    tabu_in = self.is_tabu(cand_in)
-                    tabu_out = self.is_tabu(cand_out)
-                    aspiration = self.aspiration_criteria(cand_in, delta_cost)
-                    
-                    if (not tabu_in and not tabu_out) or aspiration:
-                        if delta_cost < min_delta_cost:
-                            min_delta_cost = delta_cost
-                            best_cand_in = cand_in
-                            best_cand_out = cand_out
-                            best_move_type = "exchange"
+        if insertion_costs is not None:
+            k, delta_cost = self._best_allowed_move(insertion_costs, insertion_allowed)
+            if delta_cost < min_delta_cost:
+                min_delta_cost = delta_cost
+                best_cand_in = int(cands_in[k])
+                best_cand_out = None
+                best_move_type = "insertion"
+        
+        if removal_costs is not None:
+            k, delta_cost = self._best_allowed_move(removal_costs, removal_allowed)
+            if delta_cost < min_delta_cost:
+                min_delta_cost = delta_cost
+                best_cand_in = None
+                best_cand_out = int(cands_out[k])
+                best_move_type = "removal"
+        
+        if exchange_costs is not None:
+            k, delta_cost = self._best_allowed_move(exchange_costs, exchange_allowed)
+            if delta_cost < min_delta_cost:
+                min_delta_cost = delta_cost
+                i, j = np.unravel_index(k, exchange_costs.shape)
+                best_cand_in = int(cands_in[i])
+                best_cand_out = int(cands_out[j])
+                best_move_type = "exchange"
         
         # 5. IMPLEMENTA O MELHOR MOVIMENTO (mesmo que não seja melhorador)
         if best_move_type is None:
-            print("AVISO: Nenhum movimento válido encontrado!")
-            return None
-        
-        # Executa o movimento escolhido
-        if best_move_type == "insertion":
-            self.add_to_tabu_list(self.fake_element)
-            self.add_to_tabu_list(best_cand_in)
-            self.current_sol.add_element(best_cand_in)
-            
-        elif best_move_type == "removal":
-            self.add_to_tabu_list(best_cand_out)
-            self.add_to_tabu_list(self.fake_element)
-            self.current_sol.remove_element(best_cand_out)
-            
-        elif best_move_type == "exchange":
-            self.add_to_tabu_list(best_cand_out)
-            self.add_to_tabu_list(best_cand_in)
-            self.current_sol.remove_element(best_cand_out)
-            self.current_sol.add_element(best_cand_in)
-        
-        # Reavalia solução atual
-        self.obj_function.evaluate(self.current_sol)
+            # Silencioso quando a saída está desligada (p. ex. nos processos do multistart)
+            if self.VERBOSE:
+                print("AVISO: Nenhum movimento válido encontrado!")
+            return
         
-        return None
+        self._apply_move(best_move_type, best_cand_in, best_cand_out)
 
 
 # Função de conveniência para criar o solver
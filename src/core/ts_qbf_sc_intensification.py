@@ -14,7 +14,10 @@ Estratégia Intensification by Neighborhood:
 """
 
 import random
-from typing import Optional, List, Set
+from typing import Optional, List, Set, Tuple
+
+import numpy as np
+
 from core.ts_qbf_sc_first_improving import TabuSearchQBFScFirstImproving
 
 
@@ -49,8 +52,15 @@ class TabuSearchQBFScIntensification(TabuSearchQBFScFirstImproving):
         self.intensification_period = intensification_period
         
         # Elite list: elementos que aparecem frequentemente nas melhores soluções
+        size = self.obj_function.get_domain_size()
         self.elite_list: Set[int] = set()
-        self.element_frequency: dict = {}  # Frequência dos elementos nas soluções de alta qualidade
+        self.element_frequency = np.zeros(size, dtype=np.int32)  # Frequência dos elementos nas soluções de alta qualidade
+        self._elite_mask = np.zeros(size, dtype=bool)
+        
+        # Ordem da primeira aparição de cada elemento (-1 = nunca visto), usada
+        # como desempate entre frequências iguais
+        self._first_seen = np.full(size, -1, dtype=np.int64)
+        self._seen_count = 0
         
         # Controle de intensificação
         self.intensification_mode = False
@@ -58,8 +68,8 @@ class TabuSearchQBFScIntensification(TabuSearchQBFScFirstImproving):
         self.last_best_cost = float('inf')
         self.intensification_counter = 0
         
-        # Histórico para análise
-        self.best_solutions_history = []
+        # Histórico para análise: (iteração, custo) de cada nova melhor solução
+        self.best_solutions_history: List[Tuple[int, float]] = []
         self.intensification_phases = []
     
     def update_elite_list(self, solution):
@@ -69,15 +79,46 @@ class TabuSearchQBFScIntensification(TabuSearchQBFScFirstImproving):
         Args:
             solution: Solução para analisar
         """
+        elements = np.fromiter(solution, dtype=np.intp, count=len(solution))
+        
+        # Registra a ordem de primeira aparição dos elementos novos
+        new = elements[self._first_seen[elements] < 0]
+        self._first_seen[new] = np.arange(self._seen_count, self._seen_count + new.size)
+        self._seen_count += new.size
+        
         # Atualiza frequência dos elementos
-        for element in solution:
-            self.element_frequency[element] = self.element_frequency.get(element, 0) + 1
+        self.element_frequency[elements] += 1
         
         # Reconstrói elite list com elementos mais frequentes
-        if self.element_frequency:
-            sorted_elements = sorted(self.element_frequency.items(), 
-                                   key=lambda x: x[1], reverse=True)
-            self.elite_list = set([elem for elem, _ in sorted_elements[:self.elite_size]])
+        top = self._most_frequent(self.elite_size)
+        self.elite_list = set(top.tolist())
+        self._elite_mask[:] = False
+        self._elite_mask[top] = True
+    
+    def _most_frequent(self, k: int) -> np.ndarray:
+        """
+        Retorna os k elementos mais frequentes, do mais para o menos frequente.
+        
+        Empates são resolvidos pela ordem de primeira aparição, como numa
+        ordenação estável das frequências. Usa seleção parcial (argpartition)
+        em vez de ordenar todos os elementos vistos.
+        
+        Args:
+            k (int): Número de elementos desejados
+            
+        Returns:
+            np.ndarray: Índices dos elementos selecionados
+        """
+        seen = np.flatnonzero(self._first_seen >= 0)
+        if k <= 0 or seen.size == 0:
+            return seen[:0]
+        
+        # Chave única por elemento: maior frequência primeiro, depois quem apareceu antes
+        key = self.element_frequency[seen].astype(np.int64) * self._seen_count - self._first_seen[seen]
+        if k < seen.size:
+            part = np.argpartition(-key, k - 1)[:k]
+            seen, key = seen[part], key[part]
+        return seen[np.argsort(-key)]
     
     def enter_intensification_mode(self, new_best_solution):
         """
@@ -119,38 +160,43 @@ class TabuSearchQBFScIntensification(TabuSearchQBFScFirstImproving):
             if self.VERBOSE:
                 print(f"  >> INTENSIFICATION MODE DESATIVADO (após {self.intensification_counter} iterações)")
     
-    def get_intensified_candidates(self, all_candidates: List[int]) -> List[int]:
+    def get_intensified_candidates(self, all_candidates: List[int]) -> np.ndarray:
         """
         Retorna lista de candidatos priorizando elementos da elite list.
         
+        Os embaralhamentos usam o módulo random, preservando a sequência de
+        números aleatórios da busca.
+        
         Args:
             all_candidates: Lista completa de candidatos
             
         Returns:
-            Lista de candidatos ordenada por prioridade (elite primeiro)
+            np.ndarray: Candidatos ordenados por prioridade (elite primeiro)
         """
+        candidates = np.asarray(all_candidates, dtype=np.intp)
         if not self.elite_list:
-            return all_candidates
+            return candidates
         
-        # Separa candidatos em elite e não-elite
-        elite_candidates = [c for c in all_candidates if c in self.elite_list]
-        non_elite_candidates = [c for c in all_candidates if c not in self.elite_list]
+        # Separa candidatos em elite e não-elite com a máscara da elite list
+        is_elite = self._elite_mask[candidates]
+        elite_candidates = candidates[is_elite].tolist()
+        non_elite_candidates = candidates[~is_elite].tolist()
         
         # Durante intensificação, prioriza elite candidates
         if self.intensification_mode:
             # 70% de chance de focar apenas na elite, 30% de incluir outros
             if random.random() < 0.7 and elite_candidates:
-                return elite_candidates
+                return np.array(elite_candidates, dtype=np.intp)
             else:
                 # Mistura priorizando elite
                 random.shuffle(elite_candidates)
                 random.shuffle(non_elite_candidates)
-                return elite_candidates + non_elite_candidates[:len(elite_candidates)]
+                return np.array(elite_candidates + non_elite_candidates[:len(elite_candidates)], dtype=np.intp)
         else:
             # Modo normal: apenas reorganiza colocando elite primeiro
             random.shuffle(elite_candidates)
             random.shuffle(non_elite_candidates)
-            return elite_candidates + non_elite_candidates
+            return np.array(elite_candidates + non_elite_candidates, dtype=np.intp)
     
     def neighborhood_move(self) -> Optional[None]:
         """
@@ -174,149 +220,22 @@ class TabuSearchQBFScIntensification(TabuSearchQBFScFirstImproving):
             self.exit_intensification_mode()
         
         # Obtém candidatos com priorização baseada na estratégia
-        base_candidates = self.candidate_list.copy()
-        prioritized_candidates = self.get_intensified_candidates(base_candidates)
+        prioritized_candidates = self.get_intensified_candidates(self.candidate_list)
+        
+        # Filtra os candidatos fora da solução mantendo a ordem de prioridade
+        in_solution = self._make_membership_mask()
+        cands_in = prioritized_candidates[~in_solution[prioritized_candidates]]
         
-        # 1. AVALIA INSERÇÕES COM PRIORIZAÇÃO
-        for cand_in in prioritized_candidates:
-            if not self.current_sol.contains_element(cand_in):
-                delta_cost = self.obj_function.evaluate_insertion_cost(cand_in, self.current_sol)
-                
-                # Verifica se movimento é permitido
-                if (not self.is_tabu(cand_in) or 
-                    self.aspiration_criteria(cand_in, delta_cost)):
-                    
-                    # FIRST-IMPROVING: aceita primeiro movimento que melhora
-                    if delta_cost < 0:  # Melhoria
-                        # Executa movimento de inserção
-                        self.add_to_tabu_list(self.fake_element)
-                        self.add_to_tabu_list(cand_in)
-                        self.current_sol.add_element(cand_in)
-                        self.obj_function.evaluate(self.current_sol)
-                        return None
-        
-        # 2. AVALIA REMOÇÕES COM PRIORIZAÇÃO
         # Para remoções, usamos ordem baseada na elite list
-        current_elements = list(self.current_sol)
+        cands_out = np.fromiter(self.current_sol, dtype=np.intp, count=len(self.current_sol))
         if self.intensification_mode and self.elite_list:
             # Durante intensificação, evita remover elementos da elite
-            non_elite_elements = [e for e in current_elements if e not in self.elite_list]
-            elite_elements = [e for e in current_elements if e in self.elite_list]
-            prioritized_removal = non_elite_elements + elite_elements
-        else:
-            prioritized_removal = current_elements
+            is_elite = self._elite_mask[cands_out]
+            cands_out = np.concatenate((cands_out[~is_elite], cands_out[is_elite]))
         
-        for cand_out in prioritized_removal:
-            delta_cost = self.obj_function.evaluate_removal_cost(cand_out, self.current_sol)
-            
-            # Verifica se movimento é permitido
-            if (not self.is_tabu(cand_out) or 
-                self.aspiration_criteria(cand_out, delta_cost)):
-                
-                # FIRST-IMPROVING: aceita primeiro movimento que melhora
-                if delta_cost < 0:  # Melhoria
-                    # Executa movimento de remoção
-                    self.add_to_tabu_list(cand_out)
-                    self.add_to_tabu_list(self.fake_element)
-                    self.current_sol.remove_element(cand_out)
-                    self.obj_function.evaluate(self.current_sol)
-                    return None
-        
-        # 3. AVALIA TROCAS COM PRIORIZAÇÃO
-        for cand_in in prioritized_candidates:
-            if not self.current_sol.contains_element(cand_in):
-                for cand_out in prioritized_removal:
-                    delta_cost = self.obj_function.evaluate_exchange_cost(cand_in, cand_out, self.current_sol)
-                    
-                    # Para troca, ambos elementos devem ser permitidos
-                    tabu_in_ok = not self.is_tabu(cand_in) or self.aspiration_criteria(cand_in, delta_cost)
-                    tabu_out_ok = not self.is_tabu(cand_out) or self.aspiration_criteria(cand_out, delta_cost)
-                    
-                    if tabu_in_ok and tabu_out_ok:
-                        # FIRST-IMPROVING: aceita primeiro movimento que melhora
-                        if delta_cost < 0:  # Melhoria
-                            # Executa movimento de troca
-                            self.add_to_tabu_list(cand_out)
-                            self.add_to_tabu_list(cand_in)
-                            self.current_sol.remove_element(cand_out)
-                            self.current_sol.add_element(cand_in)
-                            self.obj_function.evaluate(self.current_sol)
-                            return None
-        
-        # 4. SE NENHUM MOVIMENTO MELHORADOR ENCONTRADO, USA MELHOR MOVIMENTO DISPONÍVEL
-        # (mantém a lógica original para garantir que sempre há movimento)
-        min_delta_cost = float('inf')
-        best_cand_in = None
-        best_cand_out = None
-        best_move_type = None
-        
-        # Reavalia inserções para encontrar o melhor movimento não-melhorador
-        for cand_in in prioritized_candidates:
-            if not self.current_sol.contains_element(cand_in):
-                delta_cost = self.obj_function.evaluate_insertion_cost(cand_in, self.current_sol)
-                
-                if (not self.is_tabu(cand_in) or 
-                    self.aspiration_criteria(cand_in, delta_cost)):
-                    
-                    if delta_cost < min_delta_cost:
-                        min_delta_cost = delta_cost
-                        best_cand_in = cand_in
-                        best_cand_out = None
-                        best_move_type = "insertion"
-        
-        # Reavalia remoções
-        for cand_out in prioritized_removal:
-            delta_cost = self.obj_function.evaluate_removal_cost(cand_out, self.current_sol)
-            
-            if (not self.is_tabu(cand_out) or 
-                self.aspiration_criteria(cand_out, delta_cost)):
-                
-                if delta_cost < min_delta_cost:
-                    min_delta_cost = delta_cost
-                    best_cand_in = None
-                    best_cand_out = cand_out
-                    best_move_type = "removal"
-        
-        # Reavalia trocas
-        for cand_in in prioritized_candidates:
-            if not self.current_sol.contains_element(cand_in):
-                for cand_out in prioritized_removal:
-                    delta_cost = self.obj_function.evaluate_exchange_cost(cand_in, cand_out, self.current_sol)
-                    
-                    tabu_in_ok = not self.is_tabu(cand_in) or self.aspiration_criteria(cand_in, delta_cost)
-                    tabu_out_ok = not self.is_tabu(cand_out) or self.aspiration_criteria(cand_out, delta_cost)
-                    
-                    if tabu_in_ok and tabu_out_ok:
-                        if delta_cost < min_delta_cost:
-                            min_delta_cost = delta_cost
-                            best_cand_in = cand_in
-                            best_cand_out = cand_out
-                            best_move_type = "exchange"
-        
-        # 5. IMPLEMENTA O MELHOR MOVIMENTO
-        if best_move_type is None:
-            print("AVISO: Nenhum movimento válido encontrado!")
-            return None
-        
-        # Executa o movimento escolhido
-        if best_move_type == "insertion":
-            self.add_to_tabu_list(self.fake_element)
-            self.add_to_tabu_list(best_cand_in)
-            self.current_sol.add_element(best_cand_in)
-            
-        elif best_move_type == "removal":
-            self.add_to_tabu_list(best_cand_out)
-            self.add_to_tabu_list(self.fake_element)
-            self.current_sol.remove_element(best_cand_out)
-            
-        elif best_move_type == "exchange":
-            self.add_to_tabu_list(best_cand_out)
-            self.add_to_tabu_list(best_cand_in)
-            self.current_sol.remove_element(best_cand_out)
-            self.current_sol.add_element(best_cand_in)
-        
-        # Reavalia solução atual
-        self.obj_function.evaluate(self.current_sol)
+        # Explora inserções, remoções e trocas na ordem priorizada (first-improving),
+        # com o melhor movimento disponível como fallback
+        self._scan_first_improving(cands_in, cands_out)
         
         return None
     
@@ -325,6 +244,9 @@ class TabuSearchQBFScIntensification(TabuSearchQBFScFirstImproving):
         Método principal do Tabu Search com Intensification by Neighborhood.
         Sobrescreve o método base para controlar as fases de intensificação.
         """
+        # Lê a flag uma única vez, fora dos laços
+        verbose = self.VERBOSE
+        
         # Inicializa melhor solução
         self.best_sol = self.create_empty_solution()
         
@@ -338,7 +260,7 @@ class TabuSearchQBFScIntensification(TabuSearchQBFScFirstImproving):
         self.best_sol = self.current_sol.copy()
         self.last_best_cost = self.best_sol.cost
         
-        if self.VERBOSE:
+        if verbose:
             print(f"Solução inicial: {self.current_sol}")
         
         # Loop principal do Tabu Search
@@ -349,11 +271,8 @@ class TabuSearchQBFScIntensification(TabuSearchQBFScFirstImproving):
             # Verifica se encontrou nova melhor solução
             if self.current_sol.cost < self.best_sol.cost:
                 self.best_sol = self.current_sol.copy()
-                self.best_solutions_history.append({
-                    'iteration': iteration,
-                    'cost': self.best_sol.cost,
-                    'solution': list(self.best_sol)
-                })
+                # Registra apenas (iteração, custo); a solução em si já está em best_sol
+                self.best_solutions_history.append((iteration, self.best_sol.cost))
                 
                 # Reseta contador de iterações sem melhoria
                 self.iterations_since_improvement = 0
@@ -362,7 +281,7 @@ class TabuSearchQBFScIntensification(TabuSearchQBFScFirstImproving):
                 # Entra em modo de intensificação
                 self.enter_intensification_mode(self.best_sol)
                 
-                if self.VERBOSE:
+                if verbose:
                     print(f"(Iter. {iteration}) Nova melhor solução: {self.best_sol}")
         
         # Finaliza intensificação se ainda ativa
@@ -382,10 +301,10 @@ class TabuSearchQBFScIntensification(TabuSearchQBFScFirstImproving):
         if self.elite_list:
             print(f"  Elite list atual: {sorted(list(self.elite_list))}")
         
-        if self.element_frequency:
-            top_elements = sorted(self.element_frequency.items(), key=lambda x: x[1], reverse=True)[:10]
+        if self._seen_count:
+            top_elements = self._most_frequent(10)
             print(f"  Top 10 elementos mais frequentes:")
-            for elem, freq in top_elements:
+            for elem, freq in zip(top_elements.tolist(), self.element_frequency[top_elements].tolist()):
                 print(f"    Elemento {elem}: {freq} aparições")
         
         print(f"  Fases de intensificação: {len(self.intensification_phases)}")
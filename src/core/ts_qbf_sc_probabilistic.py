@@ -17,6 +17,9 @@ import random
 import math
 from typing import Optional, Any
 from collections import deque
+
+import numpy as np
+
 from core.ts_qbf_sc_first_improving import TabuSearchQBFScFirstImproving
 
 
@@ -47,8 +50,13 @@ class TabuSearchQBFScProbabilistic(TabuSearchQBFScFirstImproving):
         self.alpha = alpha
         
         # Estrutura para rastrear posições na lista tabu
-        # Mapeia elemento -> posição na lista (0 = mais recente)
-        self.tabu_positions = {}
+        # Mapeia elemento -> instante (relógio tabu) da sua entrada mais recente
+        # na lista; posição = tabu_clock - instante (0 = mais recente)
+        self.tabu_timestamps = {}
+        self.tabu_clock = 0
+        
+        # Probabilidade de aceitação por posição na lista tabu (ver make_tabu_list)
+        self.acceptance_table = []
     
     def make_tabu_list(self) -> deque:
         """
@@ -58,14 +66,19 @@ class TabuSearchQBFScProbabilistic(TabuSearchQBFScFirstImproving):
         Returns:
             deque: Lista tabu com capacidade 2*tenure preenchida com fake elements
         """
-        tabu_list = deque(maxlen=2 * self.tenure)
-        self.tabu_positions = {}
+        tabu_list = super().make_tabu_list()
+        
+        # Os elementos fake ocupam instantes anteriores ao início da busca
+        self.tabu_clock = 0
+        self.tabu_timestamps = {}
+        if tabu_list:
+            self.tabu_timestamps[self.fake_element] = 0
         
-        for i in range(2 * self.tenure):
-            tabu_list.append(self.fake_element)
-            if self.fake_element not in self.tabu_positions:
-                self.tabu_positions[self.fake_element] = []
-            self.tabu_positions[self.fake_element].append(i)
+        # As posições possíveis são 0..len-1: a probabilidade de cada uma é
+        # calculada uma única vez por lista tabu
+        max_position = len(tabu_list) - 1
+        self.acceptance_table = [math.exp(-self.alpha * (position / max_position))
+                                 for position in range(max_position + 1)] if max_position > 0 else []
         
         return tabu_list
     
@@ -73,29 +86,37 @@ class TabuSearchQBFScProbabilistic(TabuSearchQBFScFirstImproving):
         """
         Adiciona um elemento à lista tabu e atualiza posições.
         
+        As posições são derivadas de um relógio que avança a cada inserção,
+        então nenhuma posição armazenada precisa ser reescrita. Basta guardar
+        a entrada mais recente de cada elemento: as mais antigas saem antes.
+        
         Args:
             element: Elemento a ser adicionado
         """
-        if self.tabu_list is not None:
-            # Remove o mais antigo e suas posições
-            oldest = self.tabu_list.popleft()
-            if oldest in self.tabu_positions:
-                if self.tabu_positions[oldest]:
-                    self.tabu_positions[oldest].pop(0)  # Remove posição mais antiga
-                if not self.tabu_positions[oldest]:  # Se não há mais posições
-                    del self.tabu_positions[oldest]
+        if self.tabu_list:
+            # Esquece o mais antigo se esta era sua última ocorrência na lista
+            oldest = self.tabu_list[0]
+            if self._tabu_counts[oldest] == 1:
+                self.tabu_timestamps.pop(oldest, None)
             
-            # Adiciona o novo elemento
-            self.tabu_list.append(element)
+            # Adiciona o novo elemento (e atualiza o contador de ocorrências)
+            super().add_to_tabu_list(element)
             
-            # Atualiza posições - incrementa todas existentes
-            for elem in self.tabu_positions:
-                self.tabu_positions[elem] = [pos + 1 for pos in self.tabu_positions[elem]]
+            # Registra o instante do elemento inserido (posição 0 = mais recente)
+            self.tabu_clock += 1
+            self.tabu_timestamps[element] = self.tabu_clock
+    
+    def get_tabu_position(self, element: Any) -> int:
+        """
+        Retorna a posição mais recente do elemento na lista tabu.
+        
+        Args:
+            element: Elemento presente na lista tabu
             
-            # Adiciona nova posição para o elemento inserido
-            if element not in self.tabu_positions:
-                self.tabu_positions[element] = []
-            self.tabu_positions[element].append(0)  # Posição 0 = mais recente
+        Returns:
+            int: Posição (0 = mais recente)
+        """
+        return self.tabu_clock - self.tabu_timestamps[element]
     
     def get_tabu_acceptance_probability(self, element: Any) -> float:
         """
@@ -110,23 +131,20 @@ class TabuSearchQBFScProbabilistic(TabuSearchQBFScFirstImproving):
         if not self.is_tabu(element):
             return 1.0  # Não é tabu, sempre aceita
         
-        if element not in self.tabu_positions:
+        if element not in self.tabu_timestamps:
             return 1.0  # Não encontrado nas posições, aceita
         
         # Usa a posição mais recente (menor valor)
-        min_position = min(self.tabu_positions[element])
+        min_position = self.get_tabu_position(element)
         
-        # Calcula probabilidade baseada na posição
+        # Probabilidade baseada na posição, tabelada em make_tabu_list
         # Quanto menor a posição (mais recente), menor a probabilidade
         # P = exp(-alpha * position / max_position)
         max_position = len(self.tabu_list) - 1
         if max_position <= 0:
             return 0.0
         
-        normalized_age = min_position / max_position
-        probability = math.exp(-self.alpha * normalized_age)
-        
-        return probability
+        return self.acceptance_table[min_position]
     
     def probabilistic_tabu_check(self, element: Any) -> bool:
         """
@@ -169,6 +187,110 @@ class TabuSearchQBFScProbabilistic(TabuSearchQBFScFirstImproving):
         # Se não passou na aspiração padrão, usa critério probabilístico
         return self.probabilistic_tabu_check(element)
     
+    def _acceptance_probabilities(self, elements: np.ndarray, tabu: np.ndarray) -> np.ndarray:
+        """
+        Calcula a probabilidade de aceitação de cada elemento tabu (1.0 para os demais).
+        
+        Args:
+            elements (np.ndarray): Elementos dos movimentos
+            tabu (np.ndarray): Máscara dos elementos tabu
+            
+        Returns:
+            np.ndarray: Probabilidade de aceitação por elemento
+        """
+        probabilities = np.ones(len(elements))
+        for k in np.flatnonzero(tabu).tolist():
+            probabilities[k] = self.get_tabu_acceptance_probability(int(elements[k]))
+        return probabilities
+    
+    def _draw_slots(self, delta_costs: np.ndarray, tabu_a: np.ndarray, tabu_b: np.ndarray):
+        """
+        Determina quais movimentos dependem de sorteio para serem aceitos.
+        
+        Um lado tabu (a = inserido, b = removido) que não satisfaz a aspiração
+        padrão consome um número aleatório, primeiro o lado a e depois o b,
+        na ordem da varredura (como em aspiration_criteria).
+        
+        Args:
+            delta_costs (np.ndarray): Custos dos movimentos, na ordem da varredura
+            tabu_a (np.ndarray): Máscara tabu do primeiro elemento de cada movimento
+            tabu_b (np.ndarray): Máscara tabu do segundo elemento de cada movimento
+            
+        Returns:
+            tuple: Máscaras de sorteio (need_a, need_b), número de sorteios por
+            movimento e índice do primeiro sorteio de cada movimento
+        """
+        standard = self.aspiration_mask(delta_costs)
+        need_a = tabu_a & ~standard
+        need_b = tabu_b & ~standard
+        slots = need_a.astype(np.intp) + need_b
+        first_slot = np.cumsum(slots) - slots
+        return need_a, need_b, slots, first_slot
+    
+    def _first_accepted_improving(self, delta_costs: np.ndarray, tabu_a: np.ndarray, prob_a: np.ndarray,
+                                  tabu_b: np.ndarray, prob_b: np.ndarray) -> Optional[int]:
+        """
+        Encontra o primeiro movimento aceito que melhora a solução, sorteando
+        exatamente os mesmos números aleatórios que a varredura elemento a
+        elemento sortearia até parar.
+        
+        Args:
+            delta_costs (np.ndarray): Custos dos movimentos, na ordem da varredura
+            tabu_a, tabu_b (np.ndarray): Máscaras tabu dos elementos de cada movimento
+            prob_a, prob_b (np.ndarray): Probabilidades de aceitação dos elementos
+            
+        Returns:
+            Optional[int]: Índice do movimento ou None se nenhum foi aceito
+        """
+        need_a, need_b, slots, first_slot = self._draw_slots(delta_costs, tabu_a, tabu_b)
+        improving = delta_costs < 0
+        free = ~(need_a | need_b)
+        
+        # Primeiro movimento melhorador aceito sem sorteio; antes dele, apenas
+        # movimentos melhoradores que dependem de sorteio podem parar a varredura
+        hits = np.flatnonzero(free & improving)
+        stop = int(hits[0]) if hits.size else len(delta_costs)
+        
+        # Gerador global do módulo random (semeado pela busca), em nome local
+        rand = random.random
+        draws = []
+        for m in np.flatnonzero(improving[:stop] & ~free[:stop]).tolist():
+            draws.extend(rand() for _ in range(first_slot[m] + slots[m] - len(draws)))
+            slot = int(first_slot[m])
+            accepted_a = not need_a[m] or draws[slot] < prob_a[m]
+            accepted_b = not need_b[m] or draws[slot + int(need_a[m])] < prob_b[m]
+            if accepted_a and accepted_b:
+                return m
+        
+        # Consome os sorteios restantes da varredura até o ponto de parada
+        total = int(first_slot[stop]) if stop < len(delta_costs) else int(slots.sum())
+        for _ in range(total - len(draws)):
+            rand()
+        
+        return stop if stop < len(delta_costs) else None
+    
+    def _accepted_mask(self, delta_costs: np.ndarray, tabu_a: np.ndarray, prob_a: np.ndarray,
+                       tabu_b: np.ndarray, prob_b: np.ndarray) -> np.ndarray:
+        """
+        Sorteia a aceitação de todos os movimentos, na ordem da varredura.
+        
+        Args:
+            delta_costs (np.ndarray): Custos dos movimentos, na ordem da varredura
+            tabu_a, tabu_b (np.ndarray): Máscaras tabu dos elementos de cada movimento
+            prob_a, prob_b (np.ndarray): Probabilidades de aceitação dos elementos
+            
+        Returns:
+            np.ndarray: Máscara dos movimentos aceitos
+        """
+        need_a, need_b, slots, first_slot = self._draw_slots(delta_costs, tabu_a, tabu_b)
+        rand = random.random
+        draws = np.array([rand() for _ in range(int(slots.sum()))])
+        
+        accepted = np.ones(len(delta_costs), dtype=bool)
+        accepted[need_a] = draws[first_slot[need_a]] < prob_a[need_a]
+        accepted[need_b] &= draws[first_slot[need_b] + need_a[need_b]] < prob_b[need_b]
+        return accepted
+    
     def neighborhood_move(self) -> Optional[None]:
         """
         Executa movimento de vizinhança usando estratégia PROBABILISTIC TS.
@@ -176,140 +298,107 @@ class TabuSearchQBFScProbabilistic(TabuSearchQBFScFirstImproving):
         Igual ao first-improving, mas com critério de aceitação probabilístico
         para movimentos tabu ao invés de apenas aspiração determinística.
         
+        A aceitação é decidida em lote, mas os números aleatórios são sorteados
+        na mesma ordem e quantidade da varredura movimento a movimento.
+        
         Returns:
             Optional[None]: None (modifica solução atual in-place)
         """
         self.update_candidate_list()
         
+        # A solução atual e a lista tabu só mudam quando um movimento é executado:
+        # candidatos, status tabu e probabilidades são calculados uma única vez
+        cands_in = self._get_available_candidates()
+        cands_out = np.fromiter(self.current_sol, dtype=np.intp, count=len(self.current_sol))
+        tabu_in = self.tabu_mask(cands_in)
+        tabu_out = self.tabu_mask(cands_out)
+        prob_in = self._acceptance_probabilities(cands_in, tabu_in)
+        prob_out = self._acceptance_probabilities(cands_out, tabu_out)
+        no_tabu_in = np.zeros(len(cands_in), dtype=bool)
+        no_tabu_out = np.zeros(len(cands_out), dtype=bool)
+        
+        # Os custos de cada tipo de movimento são calculados em lote quando a
+        # varredura chega a ele e reaproveitados no fallback
+        # (em float64, como na comparação elemento a elemento)
+        insertion_costs = np.asarray(self.obj_function.evaluate_all_insertion_costs(self.current_sol),
+                                     dtype=np.float64)[cands_in]
+        
         # 1. AVALIA INSERÇÕES - FIRST-IMPROVING COM PROBABILISTIC TS
-        for cand_in in self.candidate_list:
-            if not self.current_sol.contains_element(cand_in):
-                delta_cost = self.obj_function.evaluate_insertion_cost(cand_in, self.current_sol)
-                
-                # Verifica se movimento é permitido (não-tabu ou aceito probabilisticamente)
-                if (not self.is_tabu(cand_in) or 
-                    self.aspiration_criteria(cand_in, delta_cost)):
-                    
-                    # FIRST-IMPROVING: aceita primeiro movimento que melhora
-                    if delta_cost < 0:  # Melhoria (custo negativo = melhoria na QBF inversa)
-                        # Executa movimento de inserção
-                        self.add_to_tabu_list(self.fake_element)  # Nada removido
-                        self.add_to_tabu_list(cand_in)           # Elemento inserido vira tabu
-                        self.current_sol.add_element(cand_in)
-                        self.obj_function.evaluate(self.current_sol)
-                        return None
+        k = self._first_accepted_improving(insertion_costs, tabu_in, prob_in, no_tabu_in, prob_in)
+        if k is not None:
+            self._apply_move("insertion", int(cands_in[k]), None)
+            return None
         
         # 2. AVALIA REMOÇÕES - FIRST-IMPROVING COM PROBABILISTIC TS
-        for cand_out in list(self.current_sol):
-            delta_cost = self.obj_function.evaluate_removal_cost(cand_out, self.current_sol)
-            
-            # Verifica se movimento é permitido
-            if (not self.is_tabu(cand_out) or 
-                self.aspiration_criteria(cand_out, delta_cost)):
-                
-                # FIRST-IMPROVING: aceita primeiro movimento que melhora
-                if delta_cost < 0:  # Melhoria
-                    # Executa movimento de remoção
-                    self.add_to_tabu_list(cand_out)           # Elemento removido vira tabu
-                    self.add_to_tabu_list(self.fake_element)  # Nada inserido
-                    self.current_sol.remove_element(cand_out)
-                    self.obj_function.evaluate(self.current_sol)
-                    return None
+        removal_costs = np.asarray(self.obj_function.evaluate_all_removal_costs(self.current_sol),
+                                   dtype=np.float64)[cands_out]
+        k = self._first_accepted_improving(removal_costs, no_tabu_out, prob_out, tabu_out, prob_out)
+        if k is not None:
+            self._apply_move("removal", None, int(cands_out[k]))
+            return None
         
         # 3. AVALIA TROCAS (2-EXCHANGE) - FIRST-IMPROVING COM PROBABILISTIC TS
-        for cand_in in self.candidate_list:
-            if not self.current_sol.contains_element(cand_in):
-                for cand_out in list(self.current_sol):
-                    delta_cost = self.obj_function.evaluate_exchange_cost(cand_in, cand_out, self.current_sol)
-                    
-                    # Para troca, ambos elementos devem ser permitidos
-                    tabu_in_ok = not self.is_tabu(cand_in) or self.aspiration_criteria(cand_in, delta_cost)
-                    tabu_out_ok = not self.is_tabu(cand_out) or self.aspiration_criteria(cand_out, delta_cost)
-                    
-                    if tabu_in_ok and tabu_out_ok:
-                        # FIRST-IMPROVING: aceita primeiro movimento que melhora
-                        if delta_cost < 0:  # Melhoria
-                            # Executa movimento de troca
-                            self.add_to_tabu_list(cand_out)  # Elemento removido vira tabu
-                            self.add_to_tabu_list(cand_in)   # Elemento inserido vira tabu
-                            self.current_sol.remove_element(cand_out)
-                            self.current_sol.add_element(cand_in)
-                            self.obj_function.evaluate(self.current_sol)
-                            return None
+        # Os pares são achatados linha a linha (ordem da varredura); ambos os
+        # elementos da troca devem ser permitidos
+        n_in, n_out = len(cands_in), len(cands_out)
+        exchange_costs = None
+        if n_in and n_out:
+            exchange_costs = np.asarray(self.obj_function.evaluate_all_exchange_costs(cands_in, cands_out, self.current_sol),
+                                        dtype=np.float64).ravel()
+            exchange_sides = (np.repeat(tabu_in, n_out), np.repeat(prob_in, n_out),
+                              np.tile(tabu_out, n_in), np.tile(prob_out, n_in))
+            k = self._first_accepted_improving(exchange_costs, *exchange_sides)
+            if k is not None:
+                i, j = divmod(k, n_out)
+                self._apply_move("exchange", int(cands_in[i]), int(cands_out[j]))
+                return None
         
         # 4. SE NENHUM MOVIMENTO MELHORADOR ENCONTRADO, USA MELHOR MOVIMENTO DISPONÍVEL
+        # Os custos não mudaram; apenas a aceitação probabilística é sorteada de novo
         min_delta_cost = float('inf')
         best_cand_in = None
         best_cand_out = None
         best_move_type = None
         
         # Reavalia inserções para encontrar o melhor movimento não-melhorador
-        for cand_in in self.candidate_list:
-            if not self.current_sol.contains_element(cand_in):
-                delta_cost = self.obj_function.evaluate_insertion_cost(cand_in, self.current_sol)
-                
-                if (not self.is_tabu(cand_in) or 
-                    self.aspiration_criteria(cand_in, delta_cost)):
-                    
-                    if delta_cost < min_delta_cost:
-                        min_delta_cost = delta_cost
-                        best_cand_in = cand_in
-                        best_cand_out = None
-                        best_move_type = "insertion"
+        if n_in:
+            allowed = self._accepted_mask(insertion_costs, tabu_in, prob_in, no_tabu_in, prob_in)
+            k, delta_cost = self._best_allowed_move(insertion_costs, allowed)
+            if delta_cost < min_delta_cost:
+                min_delta_cost = delta_cost
+                best_cand_in = int(cands_in[k])
+                best_cand_out = None
+                best_move_type = "insertion"
         
         # Reavalia remoções
-        for cand_out in list(self.current_sol):
-            delta_cost = self.obj_function.evaluate_removal_cost(cand_out, self.current_sol)
-            
-            if (not self.is_tabu(cand_out) or 
-                self.aspiration_criteria(cand_out, delta_cost)):
-                
-                if delta_cost < min_delta_cost:
-                    min_delta_cost = delta_cost
-                    best_cand_in = None
-                    best_cand_out = cand_out
-                    best_move_type = "removal"
+        if n_out:
+            allowed = self._accepted_mask(removal_costs, no_tabu_out, prob_out, tabu_out, prob_out)
+            k, delta_cost = self._best_allowed_move(removal_costs, allowed)
+            if delta_cost < min_delta_cost:
+                min_delta_cost = delta_cost
+                best_cand_in = None
+                best_cand_out = int(cands_out[k])
+                best_move_type = "removal"
         
         # Reavalia trocas
-        for cand_in in self.candidate_list:
-            if not self.current_sol.contains_element(cand_in):
-                for cand_out in list(self.current_sol):
-                    delta_cost = self.obj_function.evaluate_exchange_cost(cand_in, cand_out, self.current_sol)
-                    
-                    tabu_in_ok = not self.is_tabu(cand_in) or self.aspiration_criteria(cand_in, delta_cost)
-                    tabu_out_ok = not self.is_tabu(cand_out) or self.aspiration_criteria(cand_out, delta_cost)
-                    
-                    if tabu_in_ok and tabu_out_ok:
-                        if delta_cost < min_delta_cost:
-                            min_delta_cost = delta_cost
-                            best_cand_in = cand_in
-                            best_cand_out = cand_out
-                            best_move_type = "exchange"
+        if exchange_costs is not None:
+            allowed = self._accepted_mask(exchange_costs, *exchange_sides)
+            k, delta_cost = self._best_allowed_move(exchange_costs, allowed)
+            if delta_cost < min_delta_cost:
+                min_delta_cost = delta_cost
+                i, j = divmod(k, n_out)
+                best_cand_in = int(cands_in[i])
+                best_cand_out = int(cands_out[j])
+                best_move_type = "exchange"
         
         # 5. IMPLEMENTA O MELHOR MOVIMENTO
         if best_move_type is None:
-            print("AVISO: Nenhum movimento válido encontrado!")
+            # Silencioso quando a saída está desligada (p. ex. nos processos do multistart)
+            if self.VERBOSE:
+                print("AVISO: Nenhum movimento válido encontrado!")
             return None
         
-        # Executa o movimento escolhido
-        if best_move_type == "insertion":
-            self.add_to_tabu_list(self.fake_element)
-            self.add_to_tabu_list(best_cand_in)
-            self.current_sol.add_element(best_cand_in)
-            
-        elif best_move_type == "removal":
-            self.add_to_tabu_list(best_cand_out)
-            self.add_to_tabu_list(self.fake_element)
-            self.current_sol.remove_element(best_cand_out)
-            
-        elif best_move_type == "exchange":
-            self.add_to_tabu_list(best_cand_out)
-            self.add_to_tabu_list(best_cand_in)
-            self.current_sol.remove_element(best_cand_out)
-            self.current_sol.add_element(best_cand_in)
-        
-        # Reavalia solução atual
-        self.obj_function.evaluate(self.current_sol)
+        self._apply_move(best_move_type, best_cand_in, best_cand_out)
         
         return None
     
@@ -319,11 +408,11 @@ class TabuSearchQBFScProbabilistic(TabuSearchQBFScFirstImproving):
         print(f"  Alpha (parâmetro): {self.alpha}")
         print(f"  Elementos na lista tabu: {len([x for x in self.tabu_list if x != self.fake_element])}")
         
-        if self.tabu_positions:
+        if self.tabu_timestamps:
             print(f"  Elementos com posições:")
-            for elem, positions in self.tabu_positions.items():
-                if elem != self.fake_element and positions:
-                    min_pos = min(positions)
+            for elem in self.tabu_timestamps:
+                if elem != self.fake_element:
+                    min_pos = self.get_tabu_position(elem)
                     prob = self.get_tabu_acceptance_probability(elem)
                     print(f"    Elemento {elem}: pos_min={min_pos}, prob={prob:.3f}")
 
@@ -11,10 +11,9 @@ import time
 import traceback
 from typing import Optional
 
+from core.qbf import QBF
+from core.qbf_sc import load_qbf_sc
 from core.ts_qbf_sc import TabuSearchQBFSc
-from core.ts_qbf_sc_first_improving import TabuSearchQBFScFirstImproving
-from core.ts_qbf_sc_probabilistic import TabuSearchQBFScProbabilistic
-from core.ts_qbf_sc_intensification import TabuSearchQBFScIntensification
 
 
 def print_usage():
@@ -36,6 +35,7 @@ def print_usage():
     print("  debug       : Ativa modo debug detalhado")
     print("  quiet       : Desativa saídas verbosas")
     print("  seed=N      : Define seed aleatória (ex: seed=42)")
+    print("  workers=N   : Buscas independentes em paralelo, seeds seed..seed+N-1 (padrão: 1)")
     print()
     print("Métodos disponíveis:")
     print("  best-improving  : Explora toda vizinhança, escolhe melhor movimento")
@@ -56,6 +56,69 @@ def print_usage():
     print("  python main.py 20 1000 instances/qbf200 method=probabilistic alpha=1.5")
     print("  python main.py 20 1000 instances/qbf200 method=intensification elite=8 period=30")
     print("  python main.py 50 1000 instances/qbf200 method=first-improving  # tenure diferente")
+    print("  python main.py 20 1000 instances/qbf200 method=probabilistic workers=4")
+
+
+METHODS = ['best-improving', 'first-improving', 'probabilistic', 'intensification']
+
+
+def _parse_seed(parsed, value, arg):
+    """Opção seed=N."""
+    try:
+        parsed['seed'] = int(value)
+    except ValueError:
+        print(f"AVISO: Seed inválida '{arg}', usando seed=0")
+
+
+def _parse_method(parsed, value, arg):
+    """Opção method=X."""
+    if value in METHODS:
+        parsed['method'] = value
+    else:
+        print(f"AVISO: Método inválido '{value}', usando best-improving")
+        print("Métodos válidos: best-improving, first-improving, probabilistic, intensification")
+
+
+def _positive_option(key, convert, default, positive_warning, invalid_name):
+    """
+    Cria o tratador de uma opção numérica que deve ser positiva.
+    
+    Args:
+        key (str): Chave do parâmetro no dicionário
+        convert: Conversor do valor (int ou float)
+        default: Valor padrão usado quando o valor não é positivo ou é inválido
+        positive_warning (str): Nome usado no aviso de valor não positivo
+        invalid_name (str): Nome usado no aviso de valor inválido
+        
+    Returns:
+        Função (parsed, value, arg) que atualiza o parâmetro
+    """
+    def handler(parsed, value, arg):
+        try:
+            parsed[key] = convert(value)
+            if parsed[key] <= 0:
+                print(f"AVISO: {positive_warning} deve ser positivo, usando {default}")
+                parsed[key] = default
+        except ValueError:
+            print(f"AVISO: Valor {invalid_name} inválido '{arg}', usando {default}")
+    return handler
+
+
+# Opções com valor (chave=valor), despachadas pela chave
+OPTION_HANDLERS = {
+    'seed': _parse_seed,
+    'method': _parse_method,
+    'alpha': _positive_option('alpha', float, 2.0, "Alpha", "alpha"),
+    'elite': _positive_option('elite_size', int, 5, "Elite size", "elite"),
+    'period': _positive_option('intensification_period', int, 50, "Período", "period"),
+    'workers': _positive_option('workers', int, 1, "Workers", "workers"),
+}
+
+# Opções sem valor
+FLAG_OPTIONS = {
+    'debug': 'debug',
+    'quiet': 'quiet',
+}
 
 
 def parse_arguments(args):
@@ -82,56 +145,18 @@ def parse_arguments(args):
             'intensification_period': 50,  # Parâmetro para Intensification
             'debug': False,
             'quiet': False,
-            'seed': 0
+            'seed': 0,
+            'workers': 1  # Buscas independentes (multistart)
         }
         
         # Processa opções adicionais
         for arg in args[4:]:
-            arg_lower = arg.lower()
+            key, sep, value = arg.lower().partition('=')
             
-            if arg_lower == 'debug':
-                parsed['debug'] = True
-            elif arg_lower == 'quiet':
-                parsed['quiet'] = True
-            elif arg_lower.startswith('seed='):
-                try:
-                    parsed['seed'] = int(arg_lower.split('=')[1])
-                except (ValueError, IndexError):
-                    print(f"AVISO: Seed inválida '{arg}', usando seed=0")
-            elif arg_lower.startswith('method='):
-                try:
-                    method = arg_lower.split('=')[1]
-                    if method in ['best-improving', 'first-improving', 'probabilistic', 'intensification']:
-                        parsed['method'] = method
-                    else:
-                        print(f"AVISO: Método inválido '{method}', usando best-improving")
-                        print("Métodos válidos: best-improving, first-improving, probabilistic, intensification")
-                except (ValueError, IndexError):
-                    print(f"AVISO: Formato de método inválido '{arg}', usando best-improving")
-            elif arg_lower.startswith('alpha='):
-                try:
-                    parsed['alpha'] = float(arg_lower.split('=')[1])
-                    if parsed['alpha'] <= 0:
-                        print(f"AVISO: Alpha deve ser positivo, usando 2.0")
-                        parsed['alpha'] = 2.0
-                except (ValueError, IndexError):
-                    print(f"AVISO: Valor alpha inválido '{arg}', usando 2.0")
-            elif arg_lower.startswith('elite='):
-                try:
-                    parsed['elite_size'] = int(arg_lower.split('=')[1])
-                    if parsed['elite_size'] <= 0:
-                        print(f"AVISO: Elite size deve ser positivo, usando 5")
-                        parsed['elite_size'] = 5
-                except (ValueError, IndexError):
-                    print(f"AVISO: Valor elite inválido '{arg}', usando 5")
-            elif arg_lower.startswith('period='):
-                try:
-                    parsed['intensification_period'] = int(arg_lower.split('=')[1])
-                    if parsed['intensification_period'] <= 0:
-                        print(f"AVISO: Período deve ser positivo, usando 50")
-                        parsed['intensification_period'] = 50
-                except (ValueError, IndexError):
-                    print(f"AVISO: Valor period inválido '{arg}', usando 50")(f"AVISO: Valor alpha inválido '{arg}', usando 2.0")
+            if sep and key in OPTION_HANDLERS:
+                OPTION_HANDLERS[key](parsed, value, arg)
+            elif not sep and key in FLAG_OPTIONS:
+                parsed[FLAG_OPTIONS[key]] = True
             else:
                 print(f"AVISO: Opção desconhecida '{arg}' ignorada")
         
@@ -169,6 +194,30 @@ def validate_parameters(params):
     return True
 
 
+def solver_class(method):
+    """
+    Retorna a classe do solver para o método escolhido.
+    
+    Args:
+        method (str): Nome do método
+        
+    Returns:
+        type: Classe do solver (subclasse de TabuSearchQBFSc)
+    """
+    # As variantes são importadas apenas quando escolhidas
+    if method == 'first-improving':
+        from core.ts_qbf_sc_first_improving import TabuSearchQBFScFirstImproving
+        return TabuSearchQBFScFirstImproving
+    elif method == 'probabilistic':
+        from core.ts_qbf_sc_probabilistic import TabuSearchQBFScProbabilistic
+        return TabuSearchQBFScProbabilistic
+    elif method == 'intensification':
+        from core.ts_qbf_sc_intensification import TabuSearchQBFScIntensification
+        return TabuSearchQBFScIntensification
+    else:  # best-improving (padrão)
+        return TabuSearchQBFSc
+
+
 def create_tabu_search(params):
     """
     Cria a instância apropriada do Tabu Search baseada no método escolhido.
@@ -179,37 +228,31 @@ def create_tabu_search(params):
     Returns:
         TabuSearchQBFSc: Instância do solver apropriado
     """
-    if params['method'] == 'first-improving':
-        return TabuSearchQBFScFirstImproving(
-            params['tenure'], 
-            params['iterations'], 
-            params['filename'], 
-            params['seed']
-        )
-    elif params['method'] == 'probabilistic':
-        return TabuSearchQBFScProbabilistic(
-            params['tenure'], 
-            params['iterations'], 
-            params['filename'], 
-            params['seed'],
-            params['alpha']
-        )
+    return solver_class(params['method'])(
+        params['tenure'],
+        params['iterations'],
+        params['filename'],
+        params['seed'],
+        **method_kwargs(params)
+    )
+
+
+def method_kwargs(params):
+    """
+    Retorna os parâmetros extras do construtor do método escolhido.
+    
+    Args:
+        params (dict): Parâmetros de configuração
+        
+    Returns:
+        dict: Argumentos nomeados específicos do método
+    """
+    if params['method'] == 'probabilistic':
+        return {'alpha': params['alpha']}
     elif params['method'] == 'intensification':
-        return TabuSearchQBFScIntensification(
-            params['tenure'], 
-            params['iterations'], 
-            params['filename'], 
-            params['seed'],
-            params['elite_size'],
-            params['intensification_period']
-        )
-    else:  # best-improving (padrão)
-        return TabuSearchQBFSc(
-            params['tenure'], 
-            params['iterations'], 
-            params['filename'], 
-            params['seed']
-        )
+        return {'elite_size': params['elite_size'],
+                'intensification_period': params['intensification_period']}
+    return {}
 
 
 def run_tabu_search(params):
@@ -223,11 +266,21 @@ def run_tabu_search(params):
         dict: Resultados da execução
     """
     try:
-        # Cria solver apropriado
-        ts = create_tabu_search(params)
+        # Mensagens de carregamento da instância seguem a verbosidade
+        QBF.VERBOSE = not params['quiet']
         
-        # Configura verbosidade
-        ts.set_verbose(not params['quiet'])
+        if params['workers'] > 1:
+            # No multistart os solvers vivem nos processos de trabalho; aqui
+            # só a instância é lida, para o tamanho do domínio
+            ts = None
+            domain_size = load_qbf_sc(params['filename']).get_domain_size()
+        else:
+            # Cria solver apropriado
+            ts = create_tabu_search(params)
+            domain_size = ts.obj_function.get_domain_size()
+            
+            # Configura verbosidade
+            ts.set_verbose(not params['quiet'])
         
         if not params['quiet']:
             print("="*60)
@@ -238,6 +291,9 @@ def run_tabu_search(params):
             print(f"Iterações: {params['iterations']}")
             print(f"Método: {params['method'].upper()}")
             print(f"Seed: {params['seed']}")
+            if params['workers'] > 1:
+                print(f"Workers (multistart): {params['workers']} "
+                      f"(seeds {params['seed']}..{params['seed'] + params['workers'] - 1})")
             if params['method'] == 'probabilistic':
                 print(f"Alpha (Probabilistic): {params['alpha']}")
             elif params['method'] == 'intensification':
@@ -246,10 +302,21 @@ def run_tabu_search(params):
             print("-"*60)
         
         # Executa algoritmo
-        start_time = time.time()
-        best_solution = ts.solve()
-        end_time = time.time()
-        execution_time = end_time - start_time
+        # Relógio monotônico de alta resolução (não sofre ajustes do relógio do sistema)
+        start_ns = time.perf_counter_ns()
+        if params['workers'] > 1:
+            # Buscas independentes em processos paralelos; fica a melhor
+            seeds = [params['seed'] + i for i in range(params['workers'])]
+            best_solution = solver_class(params['method']).solve_multistart(
+                params['tenure'],
+                params['iterations'],
+                params['filename'],
+                seeds,
+                **method_kwargs(params)
+            )
+        else:
+            best_solution = ts.solve()
+        execution_time = (time.perf_counter_ns() - start_ns) / 1e9
         
         # Calcula valor real da QBF (negativo da QBF inversa)
         real_qbf_value = -best_solution.cost
@@ -263,7 +330,7 @@ def run_tabu_search(params):
             'quality_info': {
                 'best_real_value': real_qbf_value,
                 'iterations': params['iterations'],
-                'domain_size': ts.obj_function.get_domain_size() if hasattr(ts.obj_function, 'get_domain_size') else len(ts.candidate_list)
+                'domain_size': domain_size
             }
         }
         
@@ -330,6 +397,9 @@ def print_results(results, params):
         if params['debug']:
             print(f"\nInformações detalhadas:")
             ts = results['tabu_search']
+            if ts is None:
+                print("  Indisponíveis no modo multistart (workers > 1): cada busca "
+                      "roda em um processo próprio e só a melhor solução retorna")
             if hasattr(ts, 'print_debug_info'):
                 ts.print_debug_info()
             if hasattr(ts, 'print_probabilistic_info'):
@@ -3,30 +3,83 @@
 run_experiments_robust.py
 
 Captura de timeout em tempo real.
-Usa threading para monitorar a saída em tempo real e capturar progresso.
+Monitora a saída dos experimentos em tempo real (select sobre os pipes) e
+captura o progresso.
 """
 
 import os
+import re
 import sys
 import time
 import csv
+import select
+import signal
 import subprocess
 import threading
 import queue
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 
+# Os padrões abaixo são aplicados com match(), ancorados no início da linha
+# (já sem espaços): o main.py sempre começa as linhas de progresso pelo
+# marcador, então as demais linhas são descartadas nos primeiros caracteres.
+
+# Linhas de solução (nova melhor ou inicial) impressas pelo main.py; custo,
+# iteração e elementos são capturados em uma única busca
+_SOLUTION_LINE_RE = re.compile(
+    r'(?:\(iter\.\s*(?P<iter>\d+)\).*?)?'
+    r'(?P<kind>nova melhor|new best|solu\w*\s+inicial)'
+    r'(?:.*?cost=\[(?P<cost>[^\]]*)\])?'
+    r'(?:.*?elements=(?P<elements>\[[^\]]*\]))?',
+    re.IGNORECASE)
+
+# Linhas do resultado final: "Valor real QBF: X" e "Elementos: [...]"
+_FINAL_LINE_RE = re.compile(r'(?P<kind>valor real qbf|elementos):\s*(?P<value>.*)', re.IGNORECASE)
+
+# Filtro sobre os bytes crus: só as linhas que casam são decodificadas e
+# interpretadas pelos padrões acima
+_PROGRESS_HINT_RE = re.compile(rb'(?:\(iter\.[^)]*\)\s*)?(?:nova melhor|new best|solu|valor real qbf|elementos)',
+                               re.IGNORECASE)
+
+
 class RobustExperimentRunner:
     """Runner com captura em tempo real de resultados parciais."""
     
+    # Colunas do CSV de resultados, na ordem em que são gravadas
+    FIELDNAMES = (
+        'status', 'config_name', 'config_description', 'method', 'tenure',
+        'instance', 'instance_path', 'objective_value', 'execution_time', 'wall_time',
+        'solution', 'iterations_completed', 'termination_reason', 'error_message', 'timestamp'
+    )
+    
+    # Custo relativo estimado de cada método, para ordenar os experimentos
+    METHOD_COST = {'first-improving': 0, 'best-improving': 1, 'probabilistic': 2, 'intensification': 3}
+    
+    # Capacidade (bytes) dos pipes que recebem a saída dos experimentos
+    PIPE_SIZE = 1 << 20
+    
     def __init__(self, instances_dir="instances/qbf_sc", results_file="experiment_results.csv", 
-                 timeout_minutes=30, max_iterations=100000):
+                 timeout_minutes=30, max_iterations=100000, max_workers=None, resume=False):
         self.instances_dir = Path(instances_dir)
         self.results_file = results_file
+        self.resume = resume
+        
+        # Experimentos em andamento, para encerrá-los se a execução for
+        # interrompida. As threads de trabalho e a principal só acessam o
+        # conjunto e a flag de parada sob o lock.
+        self._running = set()
+        self._running_lock = threading.Lock()
+        self._stopping = False
         self.timeout_seconds = timeout_minutes * 60
         self.max_iterations = max_iterations
         
+        # Experimentos simultâneos: metade dos núcleos, pois cada main.py
+        # ocupa um núcleo inteiro (1 = execução sequencial)
+        if max_workers is None:
+            max_workers = max(1, (os.cpu_count() or 1) // 2)
+        self.max_workers = max_workers
+        
         # Configurações dos experimentos
         self.configurations = [
             {
@@ -66,6 +119,13 @@ class RobustExperimentRunner:
             }
         ]
         
+        # Partes fixas da linha de comando de cada configuração; o caminho da
+        # instância (terceiro argumento do main.py) entra entre elas
+        for config in self.configurations:
+            config['cmd_head'] = [sys.executable, "main.py",
+                                  str(config['tenure']), str(self.max_iterations)]
+            config['cmd_tail'] = [f"method={config['method']}", "seed=42", *config['extra_params']]
+        
         self._validate_setup()
     
     def _validate_setup(self):
@@ -76,10 +136,12 @@ class RobustExperimentRunner:
         if not Path("main.py").exists():
             raise FileNotFoundError("main.py não encontrado no diretório atual")
         
-        instances = list(self.instances_dir.glob("instance-*.txt"))
-        print(f"✓ Encontradas {len(instances)} instâncias")
+        # Lista as instâncias uma única vez; a execução reaproveita a lista
+        self.instances = self.get_instances()
+        print(f"✓ Encontradas {len(self.instances)} instâncias")
         print(f"✓ Configurado para {len(self.configurations)} configurações")
         print(f"✓ Limite de tempo: {self.timeout_seconds/60:.2f} minutos por experimento")
+        print(f"✓ Experimentos em paralelo: {self.max_workers}")
     
     def get_instances(self):
         """Retorna lista das instâncias ordenadas."""
@@ -91,7 +153,7 @@ class RobustExperimentRunner:
         return instances
     
     def stream_reader(self, stream, stream_name, output_queue, stop_event):
-        """Thread para ler stream em tempo real."""
+        """Thread para ler stream em tempo real; ao terminar, envia (stream_name, None)."""
         try:
             while not stop_event.is_set():
                 line = stream.readline()
@@ -100,25 +162,134 @@ class RobustExperimentRunner:
                 else:
                     break
         except Exception as e:
-            output_queue.put(('error', f"Erro lendo {stream_name}: {str(e)}"))
+            output_queue.put(('error', f"Erro lendo {stream_name}: {str(e)}".encode()))
         finally:
             try:
                 stream.close()
             except:
                 pass
+            output_queue.put((stream_name, None))
+    
+    def _enlarge_pipe(self, stream):
+        """
+        Aumenta a capacidade do pipe no kernel (apenas Linux), para que o
+        processo filho não bloqueie ao escrever enquanto a saída é processada.
+        
+        Args:
+            stream: Extremidade de leitura do pipe
+        """
+        if not sys.platform.startswith('linux'):
+            return
+        
+        import fcntl
+        try:
+            fcntl.fcntl(stream.fileno(), getattr(fcntl, 'F_SETPIPE_SZ', 1031), self.PIPE_SIZE)
+        except OSError:
+            # Limite do sistema (/proc/sys/fs/pipe-max-size): mantém o padrão
+            pass
+    
+    def _read_output(self, process, deadline):
+        """
+        Gera as linhas de saída do processo (stderr redirecionado para stdout),
+        em bytes e sem espaços nas pontas, até o fluxo chegar ao fim ou o
+        prazo expirar.
+        
+        O pipe é lido em modo não bloqueante com select, sem threads
+        auxiliares; no Windows, onde select não aceita pipes, usa uma thread.
+        
+        Args:
+            process (subprocess.Popen): Processo com stdout em PIPE (bytes)
+            deadline (float): Instante (time.time()) em que a leitura é abandonada
+        """
+        if os.name == 'nt':
+            yield from self._read_output_threads(process, deadline)
+            return
+        
+        fd = process.stdout.fileno()
+        os.set_blocking(fd, False)
+        
+        # Com pidfd (Linux >= 5.3) o select também acorda quando o processo
+        # termina, mesmo que algum descendente mantenha o pipe aberto
+        pidfd = self._open_pidfd(process)
+        watched = [fd] if pidfd is None else [fd, pidfd]
+        
+        try:
+            # Bytes ainda sem quebra de linha
+            pending = b''
+            while True:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return
+                
+                # Dorme até chegar saída, o processo terminar ou o prazo expirar
+                ready, _, _ = select.select(watched, [], [], remaining)
+                if not ready:
+                    return
+                
+                if fd in ready:
+                    try:
+                        chunk = os.read(fd, 65536)
+                    except BlockingIOError:
+                        continue
+                elif pidfd in ready:
+                    # Processo terminou e o pipe está vazio
+                    chunk = b''
+                
+                if not chunk:
+                    # Fim do fluxo: entrega o que restou sem quebra de linha
+                    if pending:
+                        yield pending.strip()
+                    return
+                
+                *lines, pending = (pending + chunk).split(b'\n')
+                for line in lines:
+                    yield line.strip()
+        finally:
+            if pidfd is not None:
+                os.close(pidfd)
+    
+    def _open_pidfd(self, process):
+        """
+        Abre um descritor que fica legível quando o processo termina.
+        
+        Returns:
+            int: pidfd, ou None se o sistema não suportar (fora do Linux,
+            Python < 3.9 ou kernel < 5.3)
+        """
+        try:
+            return os.pidfd_open(process.pid)
+        except (AttributeError, OSError):
+            return None
+    
+    def _read_output_threads(self, process, deadline):
+        """Alternativa de _read_output com uma thread leitora."""
+        output_queue = queue.Queue()
+        stop_event = threading.Event()
+        
+        thread = threading.Thread(target=self.stream_reader,
+                                  args=(process.stdout, 'stdout', output_queue, stop_event),
+                                  daemon=True)
+        thread.start()
+        
+        try:
+            while True:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return
+                try:
+                    stream_name, line = output_queue.get(timeout=remaining)
+                except queue.Empty:
+                    return
+                if line is None:
+                    return
+                yield line
+        finally:
+            stop_event.set()
     
     def run_single_experiment(self, config, instance_path):
         """Executa experimento com monitoramento em tempo real."""
         
-        cmd = [
-            "python", "main.py",
-            str(config['tenure']),
-            str(self.max_iterations),
-            str(instance_path),
-            f"method={config['method']}",
-            "seed=42"
-        ]
-        cmd.extend(config['extra_params'])
+        cmd = [*config['cmd_head'], str(instance_path), *config['cmd_tail']]
         
         print(f"  Executando: {' '.join(cmd)}")
         
@@ -127,185 +298,164 @@ class RobustExperimentRunner:
             'best_value': 0.0,
             'best_solution': '[]',
             'iterations': 0,
-            'improvements': 0,
-            'all_lines': []
+            'improvements': 0
         }
         
         start_time = time.time()
+        deadline = start_time + self.timeout_seconds
         
         try:
-            # Inicia processo
+            # Inicia processo; erros vão para o mesmo pipe, na ordem em que
+            # são impressos (saída em bytes, decodificada linha a linha)
+            # Cada experimento lidera o próprio grupo de processos, para que o
+            # timeout encerre também os processos que ele criar
             process = subprocess.Popen(
                 cmd,
+                stdin=subprocess.DEVNULL,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1,
-                universal_newlines=True
-            )
-            
-            # Queue para comunicação entre threads
-            output_queue = queue.Queue()
-            stop_event = threading.Event()
-            
-            # Threads para ler stdout e stderr
-            stdout_thread = threading.Thread(
-                target=self.stream_reader,
-                args=(process.stdout, 'stdout', output_queue, stop_event),
-                daemon=True
-            )
-            stderr_thread = threading.Thread(
-                target=self.stream_reader,
-                args=(process.stderr, 'stderr', output_queue, stop_event),
-                daemon=True
+                stderr=subprocess.STDOUT,
+                close_fds=True,
+                start_new_session=os.name != 'nt',
+                creationflags=subprocess.CREATE_NEW_PROCESS_GROUP if os.name == 'nt' else 0
             )
+            with self._running_lock:
+                self._running.add(process)
+                stopping = self._stopping
             
-            stdout_thread.start()
-            stderr_thread.start()
+            # Iniciado depois da interrupção: encerra já (a leitura vê o fim)
+            if stopping:
+                self._stop_process(process)
+            self._enlarge_pipe(process.stdout)
             
-            # Monitora processo
-            while True:
-                current_time = time.time()
-                elapsed = current_time - start_time
-                
-                # Verifica se processo terminou
-                return_code = process.poll()
-                if return_code is not None:
-                    stop_event.set()
+            try:
+                # Processa a saída até o processo fechá-la ou o tempo acabar
+                for raw_line in self._read_output(process, deadline):
+                    # Linhas sem progresso são descartadas sem decodificar
+                    if not _PROGRESS_HINT_RE.match(raw_line):
+                        continue
                     
-                    # Captura saída restante
-                    remaining_timeout = time.time() + 1
-                    while time.time() < remaining_timeout:
-                        try:
-                            stream_name, line = output_queue.get_nowait()
-                            self._update_progress(line, progress)
-                        except queue.Empty:
-                            break
+                    line = raw_line.decode('utf-8', 'replace')
+                    self._update_progress(line, progress)
                     
-                    if return_code == 0:
-                        return self._create_result('SUCCESS', config, instance_path, 
-                                                 elapsed, progress)
-                    else:
-                        return self._create_result('ERROR', config, instance_path, 
-                                                 elapsed, progress, "Erro na execução")
+                    # Mostra progresso importante
+                    if "Nova melhor" in line and progress['best_value'] > 0:
+                        print(f"    📈 Progresso [{config['name']}/{instance_path.name}]: "
+                              f"{progress['best_value']:.3f} "
+                              f"(iter ~{progress['iterations']})")
                 
-                # Verifica timeout
-                if elapsed > self.timeout_seconds:
+                # Aguarda o término no tempo que resta
+                try:
+                    return_code = process.wait(timeout=max(0.0, deadline - time.time()))
+                except subprocess.TimeoutExpired:
+                    elapsed = time.time() - start_time
                     print(f"    ⏰ Timeout após {elapsed:.1f}s")
                     
                     # Para processo
-                    try:
-                        process.terminate()
-                        process.wait(timeout=2)
-                    except subprocess.TimeoutExpired:
-                        process.kill()
-                        process.wait()
-                    
-                    stop_event.set()
+                    self._stop_process(process)
                     
                     return self._create_result('TIMEOUT', config, instance_path, 
                                              elapsed, progress, 
                                              f"Timeout após {self.timeout_seconds/60:.1f} minutos")
                 
-                # Processa saída disponível
-                try:
-                    stream_name, line = output_queue.get(timeout=0.5)
-                    self._update_progress(line, progress)
-                    
-                    # Mostra progresso importante
-                    if "Nova melhor" in line and progress['best_value'] > 0:
-                        print(f"    📈 Progresso: {progress['best_value']:.3f} "
-                              f"(iter ~{progress['iterations']})")
-                
-                except queue.Empty:
-                    continue
-                except Exception as e:
-                    continue
+                # O líder terminou, mas descendentes na sessão (ex.: workers do
+                # multistart) podem seguir vivos e pesar nos demais experimentos
+                self._signal_group(process)
+            finally:
+                with self._running_lock:
+                    self._running.discard(process)
+                process.stdout.close()
+            
+            elapsed = time.time() - start_time
+            if return_code == 0:
+                return self._create_result('SUCCESS', config, instance_path, 
+                                         elapsed, progress)
+            else:
+                return self._create_result('ERROR', config, instance_path, 
+                                         elapsed, progress, "Erro na execução")
         
         except Exception as e:
             elapsed = time.time() - start_time
             return self._create_result('EXCEPTION', config, instance_path, 
                                      elapsed, progress, str(e))
     
+    def _signal_group(self, process, force=False):
+        """
+        Sinaliza o grupo de processos do experimento.
+        
+        Args:
+            process (subprocess.Popen): Processo líder do grupo
+            force (bool): Mata imediatamente em vez de pedir o término
+        """
+        try:
+            if os.name == 'nt':
+                if force:
+                    process.kill()
+                else:
+                    process.send_signal(signal.CTRL_BREAK_EVENT)
+            else:
+                os.killpg(process.pid, signal.SIGKILL if force else signal.SIGTERM)
+        except ProcessLookupError:
+            # O grupo já terminou
+            pass
+    
+    def _stop_process(self, process):
+        """Encerra o experimento e seus descendentes; força após 2s."""
+        self._signal_group(process)
+        try:
+            process.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            self._signal_group(process, force=True)
+            process.wait()
+    
     def _update_progress(self, line, progress):
         """Atualiza progresso baseado em linha de saída."""
         if not line:
             return
         
-        progress['all_lines'].append(line)
-        line_lower = line.lower()
-        
         try:
-            # Procura melhorias
-            if "nova melhor" in line_lower or "new best" in line_lower:
-                progress['improvements'] += 1
+            match = _SOLUTION_LINE_RE.match(line)
+            if match:
+                cost = match['cost']
+                elements = match['elements']
                 
-                # Extrai custo
-                if "cost=[" in line:
-                    cost_start = line.find("cost=[") + 6
-                    cost_end = line.find("]", cost_start)
-                    if cost_end > cost_start:
-                        cost = float(line[cost_start:cost_end])
-                        value = -cost  # QBF inversa
+                # Procura melhorias
+                if match['kind'][0] in 'nN':
+                    progress['improvements'] += 1
+                    
+                    if cost:
+                        value = -float(cost)  # QBF inversa
                         if value > progress['best_value']:
                             progress['best_value'] = value
+                    
+                    if match['iter']:
+                        iteration = int(match['iter'])
+                        if iteration > progress['iterations']:
+                            progress['iterations'] = iteration
+                    
+                    if elements:
+                        progress['best_solution'] = elements
                 
-                # Extrai iteração
-                if "(iter." in line_lower:
-                    iter_start = line.lower().find("(iter.") + 6
-                    iter_end = line.find(")", iter_start)
-                    if iter_end > iter_start:
-                        try:
-                            iteration = int(line[iter_start:iter_end])
-                            if iteration > progress['iterations']:
-                                progress['iterations'] = iteration
-                        except ValueError:
-                            pass
-                
-                # Extrai elementos
-                if "elements=[" in line:
-                    elem_start = line.find("elements=[")
-                    elem_end = line.find("]", elem_start) + 1
-                    if elem_end > elem_start:
-                        elements = line[elem_start + 9:elem_end]
-                        if elements and elements != "":
-                            progress['best_solution'] = elements
+                # Fallback: solução inicial
+                elif progress['best_value'] == 0.0:
+                    if cost:
+                        progress['best_value'] = -float(cost)
+                    if elements and progress['best_solution'] == "[]":
+                        progress['best_solution'] = elements
+                return
             
             # Procura resultado final
-            elif "valor real qbf:" in line_lower:
-                try:
-                    value_part = line.split(":")[-1].strip()
-                    value = float(value_part)
+            match = _FINAL_LINE_RE.match(line)
+            if match:
+                if match['kind'][0] in 'vV':
+                    value = float(match['value'])
                     if value > progress['best_value']:
                         progress['best_value'] = value
-                except (ValueError, IndexError):
-                    pass
-            
-            elif "elementos:" in line_lower and "[" in line:
-                try:
-                    solution_part = line.split(":", 1)[1].strip()
+                elif "[" in line:
+                    solution_part = match['value'].strip()
                     if solution_part and solution_part != "[]":
                         progress['best_solution'] = solution_part
-                except IndexError:
-                    pass
-            
-            # Fallback: solução inicial
-            elif ("solu" in line_lower and "inicial" in line_lower and 
-                  progress['best_value'] == 0.0):
-                if "cost=[" in line:
-                    cost_start = line.find("cost=[") + 6
-                    cost_end = line.find("]", cost_start)
-                    if cost_end > cost_start:
-                        cost = float(line[cost_start:cost_end])
-                        progress['best_value'] = -cost
-                
-                if "elements=[" in line and progress['best_solution'] == "[]":
-                    elem_start = line.find("elements=[")
-                    elem_end = line.find("]", elem_start) + 1
-                    if elem_end > elem_start:
-                        progress['best_solution'] = line[elem_start + 9:elem_end]
         
-        except (ValueError, IndexError):
+        except ValueError:
             # Ignora erros de parsing - continua processamento
             pass
     
@@ -339,75 +489,132 @@ class RobustExperimentRunner:
             'iterations_completed': progress['iterations'] if progress['iterations'] > 0 else 'TIMEOUT',
             'termination_reason': status,
             'error_message': error_msg,
-            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            'timestamp': time.strftime("%Y-%m-%d %H:%M:%S")
         }
     
-    def initialize_results_file(self):
-        """Inicializa arquivo CSV."""
-        fieldnames = [
-            'status', 'config_name', 'config_description', 'method', 'tenure',
-            'instance', 'instance_path', 'objective_value', 'execution_time', 'wall_time',
-            'solution', 'iterations_completed', 'termination_reason', 'error_message', 'timestamp'
-        ]
-        
-        with open(self.results_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames, delimiter=';')
-            writer.writeheader()
+    def load_completed(self):
+        """
+        Lê o CSV de resultados existente e retorna os experimentos concluídos
+        com sucesso. Os que terminaram em erro, exceção ou timeout ficam de
+        fora, para serem refeitos.
         
-        print(f"✓ Arquivo inicializado: {self.results_file}")
+        Returns:
+            dict: Linha com status SUCCESS de cada par (config_name, instance)
+                  no arquivo (a mais recente, se houver repetições)
+        """
+        try:
+            with open(self.results_file, newline='', encoding='utf-8') as f:
+                return {(row['config_name'], row['instance']): row
+                        for row in csv.DictReader(f, delimiter=';')
+                        if row['status'] == 'SUCCESS'}
+        except FileNotFoundError:
+            return {}
     
-    def save_result(self, result):
-        """Salva resultado no CSV."""
-        fieldnames = [
-            'status', 'config_name', 'config_description', 'method', 'tenure',
-            'instance', 'instance_path', 'objective_value', 'execution_time', 'wall_time',
-            'solution', 'iterations_completed', 'termination_reason', 'error_message', 'timestamp'
-        ]
+    def rewrite_results(self, rows):
+        """
+        Regrava o CSV de resultados apenas com as linhas informadas, descartando
+        as falhas que serão refeitas; assim cada par (config_name, instance)
+        tem uma única linha no arquivo. A escrita vai para um arquivo
+        temporário que substitui o original, sem risco de perder resultados.
         
-        with open(self.results_file, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames, delimiter=';')
-            writer.writerow(result)
+        Args:
+            rows: Linhas (dicionários) a manter
+        """
+        temp_file = f"{self.results_file}.tmp"
+        with open(temp_file, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=self.FIELDNAMES, delimiter=';',
+                                    extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(rows)
+        os.replace(temp_file, self.results_file)
     
     def run_all_experiments(self):
         """Executa todos os experimentos."""
-        instances = self.get_instances()
-        total = len(self.configurations) * len(instances)
+        instances = self.instances
+        
+        # Ao retomar, pula os experimentos já concluídos com sucesso no CSV
+        completed = self.load_completed() if self.resume else {}
+        tasks = [(config, instance) for config in self.configurations for instance in instances
+                 if (config['name'], instance.name) not in completed]
+        
+        # Mais longos primeiro (LPT): instâncias maiores (em bytes) e métodos
+        # mais caros saem antes, e os experimentos rápidos preenchem o final
+        instance_size = {instance: instance.stat().st_size for instance in instances}
+        tasks.sort(key=lambda task: (instance_size[task[1]], self.METHOD_COST.get(task[0]['method'], 0)),
+                   reverse=True)
+        
+        total = len(tasks)
+        skipped = len(self.configurations) * len(instances) - total
         
         print(f"\n{'='*60}")
         print(f"EXPERIMENTOS - ATIVIDADE 3")
         print(f"{'='*60}")
         print(f"⚡ Captura em tempo real de progresso")
         print(f"🔧 Total: {total} experimentos")
+        if skipped:
+            print(f"↩️  Retomando: {skipped} experimentos já concluídos com sucesso "
+                  f"(falhas e timeouts anteriores são refeitos)")
         print(f"⏰ {self.timeout_seconds/60:.1f} min por experimento")
         print(f"{'='*60}\n")
         
-        self.initialize_results_file()
-        
         count = 0
         start_global = time.time()
+        self._stopping = False
         
-        for config in self.configurations:
-            print(f"\n[CONFIG] {config['name']}")
-            print("-" * 40)
+        # O CSV fica aberto durante toda a execução; cada linha é descarregada
+        # no disco ao ser escrita, preservando os resultados em caso de falha.
+        # Ao retomar, o arquivo é regravado só com os sucessos e as novas
+        # linhas são acrescentadas a ele
+        if self.resume:
+            self.rewrite_results(completed.values())
+        with open(self.results_file, 'a' if self.resume else 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=self.FIELDNAMES, delimiter=';')
+            if f.tell() == 0:
+                writer.writeheader()
+                f.flush()
+                print(f"✓ Arquivo inicializado: {self.results_file}")
             
-            for instance in instances:
-                count += 1
-                print(f"[{count:2d}/{total}] {instance.name}")
-                
-                result = self.run_single_experiment(config, instance)
-                self.save_result(result)
+            # Os experimentos são independentes; cada um roda em um subprocesso
+            # próprio, então threads bastam para despachá-los em paralelo
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = [executor.submit(self.run_single_experiment, config, instance)
+                           for config, instance in tasks]
                 
-                # Relatório
-                if result['status'] == 'SUCCESS':
-                    print(f"  ✅ Sucesso: {result['objective_value']:.3f}")
-                elif result['status'] == 'TIMEOUT':
-                    if result['objective_value'] > 0:
-                        print(f"  ⏰ Timeout: Parcial={result['objective_value']:.3f} "
-                              f"(iter {result['iterations_completed']})")
-                    else:
-                        print(f"  ⏰ Timeout: Sem resultado parcial")
-                else:
-                    print(f"  ❌ {result['status']}")
+                # Resultados são gravados e relatados apenas nesta thread, à medida
+                # que terminam, então o CSV não precisa de lock
+                try:
+                    for future in as_completed(futures):
+                        result = future.result()
+                        writer.writerow(result)
+                        f.flush()
+                        count += 1
+                        
+                        # Relatório
+                        print(f"[{count:2d}/{total}] {result['config_name']} - {result['instance']}")
+                        if result['status'] == 'SUCCESS':
+                            print(f"  ✅ Sucesso: {result['objective_value']:.3f}")
+                        elif result['status'] == 'TIMEOUT':
+                            if result['objective_value'] > 0:
+                                print(f"  ⏰ Timeout: Parcial={result['objective_value']:.3f} "
+                                      f"(iter {result['iterations_completed']})")
+                            else:
+                                print(f"  ⏰ Timeout: Sem resultado parcial")
+                        else:
+                            print(f"  ❌ {result['status']}")
+                except BaseException:
+                    # Interrupção (Ctrl+C): os experimentos rodam em sessões
+                    # próprias e não recebem o sinal do terminal
+                    for future in futures:
+                        future.cancel()
+                    
+                    # Cópia sob o lock; processos iniciados depois disso veem
+                    # a flag e se encerram sozinhos
+                    with self._running_lock:
+                        self._stopping = True
+                        running = list(self._running)
+                    for process in running:
+                        self._stop_process(process)
+                    raise
         
         total_time = time.time() - start_global
         print(f"\n{'='*60}")
@@ -417,12 +624,13 @@ class RobustExperimentRunner:
 
 
 def main():
-    """Função principal."""
+    """Função principal. Com --resume, retoma a partir do CSV existente."""
     runner = RobustExperimentRunner(
         instances_dir="instances/qbf_sc",
         results_file="experiment_results.csv",
         timeout_minutes=30,
-        max_iterations=10000
+        max_iterations=10000,
+        resume="--resume" in sys.argv[1:]
     )
     
     try: